@@ -0,0 +1,76 @@
+"""
+Agendador de Execuções do SPF
+-----------------------------
+Este módulo fornece um agendador no estilo "spf-throttle" do OSPF, que
+agrupa rajadas de LSAs em uma única execução do SPF. Cada LSA aceito apenas
+marca a LSDB como suja; uma tarefa dedicada do laço de eventos aguarda o
+atraso inicial, respeita o tempo de espera entre execuções e dobra esse tempo
+enquanto as rajadas continuarem, até o limite máximo.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+
+class AgendadorSPF:
+    """Classe que coalesce pedidos de recálculo do SPF em uma tarefa dedicada."""
+
+    def __init__(self, executar: Callable[[], Awaitable[None]], atraso_inicial: float, espera: float, espera_maxima: float):
+        """
+        Inicializa o agendador.
+
+        Args:
+            executar: Corrotina chamada a cada execução do SPF
+            atraso_inicial: Atraso (s) entre o primeiro pedido de uma rajada e a execução
+            espera: Intervalo mínimo (s) entre duas execuções consecutivas
+            espera_maxima: Limite (s) do back-off exponencial do intervalo de espera
+        """
+        self.executar = executar
+        self.atraso_inicial = atraso_inicial
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+
+        self.espera_atual = espera
+        self.ultima_execucao = float('-inf')
+        self.pedidos = 0
+        self.execucoes = 0
+        self.evento = asyncio.Event()
+
+    def agendar(self) -> None:
+        """Marca a LSDB como suja, solicitando uma nova execução do SPF."""
+        self.pedidos += 1
+        self.evento.set()
+
+    def proximo_atraso(self, agora: float) -> float:
+        """
+        Calcula quanto tempo aguardar antes da próxima execução e ajusta o back-off.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Atraso em segundos até a execução
+        """
+        ocioso = agora - self.ultima_execucao
+        if ocioso >= 2 * self.espera_atual:
+            # Rede estável desde a última execução: volta aos tempos iniciais
+            self.espera_atual = self.espera
+            return self.atraso_inicial
+
+        atraso = max(self.atraso_inicial, self.espera_atual - ocioso)
+        self.espera_atual = min(self.espera_atual * 2, self.espera_maxima)
+        return atraso
+
+    async def laco(self) -> None:
+        """Tarefa do agendador; deve ser executada no laço de eventos do roteador."""
+        while True:
+            await self.evento.wait()
+
+            # Pedidos que chegarem durante a espera são absorvidos por esta execução
+            await asyncio.sleep(self.proximo_atraso(time.monotonic()))
+            self.evento.clear()
+
+            await self.executar()
+            self.ultima_execucao = time.monotonic()
+            self.execucoes += 1
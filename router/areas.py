@@ -0,0 +1,208 @@
+"""
+Áreas de Roteamento
+-------------------
+Este módulo divide o domínio de roteamento em áreas. Cada área tem a sua
+própria LSDB, o seu SPF incremental e as suas rotas por prefixo, de modo que
+um roteador só guarda e processa as LSAs das áreas a que pertence. Um
+roteador com vizinhos em mais de uma área é um roteador de borda (ABR): na
+LSA que origina em cada área, ele anuncia sumários das rotas das outras
+áreas, agregados com `ipaddress.collapse_addresses` e com o maior custo
+entre as redes agregadas.
+
+Como no OSPF, a área 0 é o backbone: nas demais áreas o ABR anuncia as rotas
+internas das outras áreas e as rotas entre áreas aprendidas no backbone; no
+backbone, apenas as rotas internas das outras áreas. Um ABR ligado ao
+backbone ignora os sumários recebidos nas outras áreas, o que evita laços
+entre áreas.
+"""
+
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from base_estados import LSDB
+from dycastra import SPFIncremental
+from prefixos import RotasPrefixos
+
+AREA_BACKBONE = 0
+
+
+def distribuir_prefixos(prefixos: List[str], areas_vizinhos: Dict[str, int], area_padrao: int) -> Dict[int, List[str]]:
+    """
+    Associa cada prefixo conectado à área do enlace correspondente.
+
+    Um prefixo pertence à área do vizinho cujo IP ele contém; prefixos sem
+    vizinho (redes de hosts) ficam na área padrão do roteador.
+
+    Args:
+        prefixos: Redes conectadas às interfaces do roteador
+        areas_vizinhos: Área de cada vizinho {ip: área}
+        area_padrao: Área das redes sem vizinho
+
+    Returns:
+        Dicionário {área: [prefixos]}
+    """
+    distribuidos: Dict[int, List[str]] = {}
+    for prefixo in prefixos:
+        rede = ipaddress.IPv4Network(prefixo, strict=False)
+        areas = [area for ip, area in areas_vizinhos.items() if ipaddress.IPv4Address(ip) in rede]
+        distribuidos.setdefault(min(areas, default=area_padrao), []).append(prefixo)
+    return distribuidos
+
+
+class Area:
+    """Estado de uma área: LSDB, SPF incremental e rotas por prefixo."""
+
+    def __init__(self, identificador: int, origem: str, idade_maxima: float, usar_sumarios: bool = True):
+        """
+        Args:
+            identificador: Número da área
+            origem: IP (identificador) do roteador local
+            idade_maxima: Idade (s) a partir da qual as LSAs da área são removidas
+            usar_sumarios: Se os sumários anunciados pelos ABRs da área geram rotas
+        """
+        self.identificador = identificador
+        self.lsdb = LSDB(idade_maxima)
+        self.spf = SPFIncremental(origem)
+        self.rotas = RotasPrefixos(origem, usar_sumarios)
+        self.origens_pendentes: Set[str] = set()
+        self.alternativas: Dict[str, str] = {}  # roteador -> vizinho alternativo livre de laços
+        self.topologia_alterada = False  # Algum enlace mudou na última execução do SPF
+        # origem -> (roteadores cujo caminho ou LSA foi revisto, prefixos que a origem anunciava antes)
+        self.efeitos: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
+    def calcular(self) -> Set[str]:
+        """
+        Aplica ao SPF as LSAs alteradas desde a última execução.
+
+        Returns:
+            Prefixos reavaliados (rota ou custo podem ter mudado)
+        """
+        origens, self.origens_pendentes = self.origens_pendentes, set()
+        roteadores = set(origens)
+        self.topologia_alterada = False
+        self.efeitos = {}
+        for origem in origens:
+            anteriores = set(self.rotas.prefixos_roteador.get(origem, ()))
+            self.spf.atualizar(origem, self.lsdb.entradas.get(origem))
+            roteadores |= self.spf.revisados
+            self.topologia_alterada |= self.spf.topologia_alterada
+            self.efeitos[origem] = (self.spf.revisados | {origem}, anteriores)
+        self.rotas.atualizar(roteadores, self.lsdb.entradas, self.spf)
+        return self.rotas.revisados
+
+
+class RoteamentoAreas:
+    """Classe que mantém as áreas do roteador e combina as rotas de todas elas."""
+
+    def __init__(self, origem: str, areas: Iterable[int], idade_maxima: float, prefixos: Dict[int, List[str]]):
+        """
+        Args:
+            origem: IP (identificador) do roteador local
+            areas: Áreas a que o roteador pertence
+            idade_maxima: Idade (s) a partir da qual as LSAs são removidas
+            prefixos: Prefixos conectados do roteador em cada área {área: [prefixos]}
+        """
+        identificadores = sorted(set(areas))
+        self.borda = len(identificadores) > 1
+        ignorar_sumarios = self.borda and AREA_BACKBONE in identificadores
+        self.areas = {
+            area: Area(area, origem, idade_maxima, not ignorar_sumarios or area == AREA_BACKBONE)
+            for area in identificadores
+        }
+        self.prefixos = prefixos
+        self.conectados = {str(ipaddress.IPv4Network(p, strict=False)) for lista in prefixos.values() for p in lista}
+        self.rotas: Dict[str, Tuple[str, ...]] = {}  # prefixo -> próximos saltos pela melhor área
+        self.area_rota: Dict[str, int] = {}  # prefixo -> área que fornece a rota
+        self.calculadas: List[Area] = []  # Áreas cujo SPF rodou na última execução
+
+    def executar(self) -> Dict[str, Optional[Tuple[str, ...]]]:
+        """
+        Executa o SPF das áreas com LSAs pendentes e escolhe, por prefixo, a melhor área.
+
+        Rotas internas a uma área têm preferência sobre rotas entre áreas; depois
+        vence o menor custo e, no empate, a área de menor número.
+
+        Returns:
+            Prefixos cuja rota mudou (prefixo -> próximos saltos, None se removido)
+        """
+        self.calculadas = [area for area in self.areas.values() if area.origens_pendentes]
+        revisados: Set[str] = set()
+        for area in self.calculadas:
+            revisados |= area.calcular()
+
+        alteracoes: Dict[str, Optional[Tuple[str, ...]]] = {}
+        for prefixo in revisados:
+            escolhida = None
+            if prefixo not in self.conectados:
+                for identificador, area in self.areas.items():
+                    custo = area.rotas.custos.get(prefixo)
+                    if custo is not None and (escolhida is None or custo < escolhida[0]):
+                        escolhida = (custo, identificador)
+
+            if escolhida is None:
+                novo = None
+                self.area_rota.pop(prefixo, None)
+            else:
+                novo = self.areas[escolhida[1]].rotas.rotas.get(prefixo)
+                self.area_rota[prefixo] = escolhida[1]
+            if self.rotas.get(prefixo) != novo:
+                if novo is None:
+                    del self.rotas[prefixo]
+                else:
+                    self.rotas[prefixo] = novo
+                alteracoes[prefixo] = novo
+        return alteracoes
+
+    def origens_alteradas(self, alteracoes: Dict[str, Optional[Tuple[str, ...]]]) -> Set[str]:
+        """
+        Identifica as origens cujas LSAs, na última execução, mudaram alguma rota.
+
+        Uma origem muda uma rota quando o prefixo alterado é (ou era) anunciado
+        por ela ou por um roteador cujo caminho foi revisto por causa da sua LSA.
+
+        Args:
+            alteracoes: Prefixos cuja rota mudou, retornados por executar
+
+        Returns:
+            IPs das origens responsáveis por alguma das alterações
+        """
+        origens: Set[str] = set()
+        for area in self.calculadas:
+            for origem, (roteadores, anteriores) in area.efeitos.items():
+                if not anteriores.isdisjoint(alteracoes) or any(
+                        not alteracoes.keys().isdisjoint(area.rotas.prefixos_roteador.get(roteador, ()))
+                        for roteador in roteadores):
+                    origens.add(origem)
+        return origens
+
+    def sumarios(self, destino: int) -> Dict[str, float]:
+        """
+        Calcula os sumários que este roteador, se for de borda, anuncia em uma área.
+
+        Args:
+            destino: Área em que os sumários serão anunciados
+
+        Returns:
+            Dicionário {prefixo agregado: custo}; vazio se o roteador não for de borda
+        """
+        if not self.borda:
+            return {}
+        custos: Dict[ipaddress.IPv4Network, float] = {}
+        for identificador, area in self.areas.items():
+            if identificador == destino:
+                continue
+            for prefixo in self.prefixos.get(identificador, ()):
+                custos.setdefault(ipaddress.IPv4Network(prefixo, strict=False), 0)
+            for prefixo, (entre_areas, custo) in area.rotas.custos.items():
+                if entre_areas and (identificador != AREA_BACKBONE or destino == AREA_BACKBONE):
+                    continue
+                rede = ipaddress.IPv4Network(prefixo)
+                custos[rede] = max(custos.get(rede, 0), custo)
+
+        return {
+            str(agregada): max(custo for rede, custo in custos.items() if rede.subnet_of(agregada))
+            for agregada in ipaddress.collapse_addresses(custos)
+        }
+
+    def tabela(self) -> Dict[str, Tuple[str, ...]]:
+        """Retorna a tabela combinada (prefixo -> próximos saltos)."""
+        return dict(self.rotas)
@@ -0,0 +1,176 @@
+"""
+Base de Dados de Estado de Enlace (LSDB) com Envelhecimento
+-----------------------------------------------------------
+Este módulo mantém as LSAs conhecidas junto com a idade de cada uma. A idade
+não é incrementada entrada a entrada: guarda-se o instante equivalente à
+idade zero e a idade atual é calculada sob demanda. Uma roda de
+temporizadores (hashed timing wheel) agenda o instante em que cada LSA atinge
+a idade máxima, de modo que a expiração custa O(1) por entrada e a cada tick
+só é examinado um compartimento da roda, independente do tamanho da LSDB.
+"""
+
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+
+class RodaTemporizadores:
+    """Roda de temporizadores com resolução fixa, indexada pelo instante de expiração."""
+
+    def __init__(self, resolucao: float, tamanho: int = 256):
+        """
+        Args:
+            resolucao: Duração (s) de cada compartimento da roda
+            tamanho: Quantidade de compartimentos; prazos além de uma volta
+                permanecem no compartimento até a volta correta
+        """
+        self.resolucao = resolucao
+        self.compartimentos: List[Set[Hashable]] = [set() for _ in range(tamanho)]
+        self.prazos: Dict[Hashable, Tuple[float, int]] = {}  # chave -> (prazo, compartimento)
+        self.cursor: Optional[int] = None  # Próximo tick a processar
+
+    def __len__(self) -> int:
+        return len(self.prazos)
+
+    def _tick(self, instante: float) -> int:
+        """Converte um instante no tick correspondente."""
+        return int(instante // self.resolucao)
+
+    def agendar(self, chave: Hashable, prazo: float) -> None:
+        """
+        Agenda (ou reagenda) a expiração de uma chave.
+
+        Args:
+            chave: Identificador do temporizador
+            prazo: Instante (time.monotonic) da expiração
+        """
+        self.cancelar(chave)
+        tick = self._tick(prazo)
+        if self.cursor is not None and tick < self.cursor:
+            tick = self.cursor
+        compartimento = tick % len(self.compartimentos)
+        self.compartimentos[compartimento].add(chave)
+        self.prazos[chave] = (prazo, compartimento)
+
+    def cancelar(self, chave: Hashable) -> None:
+        """
+        Cancela o temporizador de uma chave, se existir.
+
+        Args:
+            chave: Identificador do temporizador
+        """
+        agendado = self.prazos.pop(chave, None)
+        if agendado is not None:
+            self.compartimentos[agendado[1]].discard(chave)
+
+    def avancar(self, agora: float) -> List[Hashable]:
+        """
+        Avança a roda até o instante atual.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Chaves cujo prazo expirou, já removidas da roda
+        """
+        atual = self._tick(agora)
+        tamanho = len(self.compartimentos)
+        if self.cursor is None:
+            self.cursor = atual - tamanho + 1
+
+        vencidas = []
+        # Um atraso maior que uma volta só precisa percorrer cada compartimento uma vez
+        for tick in range(max(self.cursor, atual - tamanho + 1), atual + 1):
+            compartimento = self.compartimentos[tick % tamanho]
+            for chave in [c for c in compartimento if self.prazos[c][0] <= agora]:
+                compartimento.discard(chave)
+                del self.prazos[chave]
+                vencidas.append(chave)
+        # O tick atual é revisitado na próxima chamada, pois pode ter prazos ainda não vencidos
+        self.cursor = atual
+        return vencidas
+
+
+class LSDB:
+    """Classe que guarda as LSAs conhecidas, suas sequências e idades."""
+
+    def __init__(self, idade_maxima: float, resolucao: float = 1.0):
+        """
+        Args:
+            idade_maxima: Idade (s) a partir da qual uma LSA é removida (MaxAge)
+            resolucao: Resolução (s) da roda de temporizadores de expiração
+        """
+        self.idade_maxima = idade_maxima
+        self.entradas: Dict[str, Dict[str, Any]] = {}  # origem -> LSA
+        self.seqs: Dict[str, int] = {}  # origem -> maior sequência conhecida
+        self.nascimento: Dict[str, float] = {}  # origem -> instante em que a LSA tinha idade zero
+        self.roda = RodaTemporizadores(resolucao)
+
+    def __len__(self) -> int:
+        return len(self.entradas)
+
+    def eh_nova(self, origem: str, seq: int) -> bool:
+        """
+        Indica se uma LSA é mais recente que a cópia instalada.
+
+        Args:
+            origem: Roteador de origem da LSA
+            seq: Número de sequência da LSA
+
+        Returns:
+            True se a sequência for maior que a conhecida
+        """
+        return seq > self.seqs.get(origem, -1)
+
+    def instalar(self, lsa: Dict[str, Any], agora: float) -> None:
+        """
+        Instala uma LSA, substituindo a anterior da mesma origem, e agenda sua expiração.
+
+        Args:
+            lsa: LSA no formato de dicionário
+            agora: Instante atual (time.monotonic)
+        """
+        origem = lsa["id"]
+        nascimento = agora - lsa.get("idade", 0)
+        self.entradas[origem] = lsa
+        self.seqs[origem] = lsa["seq"]
+        self.nascimento[origem] = nascimento
+        self.roda.agendar(origem, nascimento + self.idade_maxima)
+
+    def idade(self, origem: str, agora: float) -> int:
+        """
+        Retorna a idade atual de uma LSA instalada.
+
+        Args:
+            origem: Roteador de origem da LSA
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Idade em segundos, limitada à idade máxima
+        """
+        return int(min(agora - self.nascimento[origem], self.idade_maxima))
+
+    def remover(self, origem: str) -> None:
+        """
+        Remove a LSA de uma origem e seu temporizador.
+
+        Args:
+            origem: Roteador de origem da LSA
+        """
+        self.entradas.pop(origem, None)
+        self.seqs.pop(origem, None)
+        self.nascimento.pop(origem, None)
+        self.roda.cancelar(origem)
+
+    def expirar(self, agora: float) -> List[str]:
+        """
+        Remove as LSAs que atingiram a idade máxima.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Origens removidas
+        """
+        vencidas = self.roda.avancar(agora)
+        for origem in vencidas:
+            self.remover(origem)
+        return vencidas
@@ -0,0 +1,95 @@
+"""
+Métrica Estável de Enlace
+-------------------------
+Este módulo transforma as medições de RTT de um enlace em um custo estável
+para o LSA. O RTT é suavizado por média móvel exponencial (EWMA) e
+quantizado em faixas inteiras; um novo custo só é anunciado quando a faixa
+se afasta da anunciada por pelo menos um limiar e o tempo mínimo desde o
+último anúncio (hold-down) já passou. Assim, a variação natural do RTT não
+provoca nova inundação nem recálculo do SPF.
+"""
+
+import math
+from typing import Optional
+
+
+class CustoEnlace:
+    """Classe que suaviza, quantiza e filtra com histerese o custo de um enlace."""
+
+    def __init__(self, custo_fixo: int, alfa: float, largura_faixa: float, limiar: int, espera: float):
+        """
+        Args:
+            custo_fixo: Custo configurado na topologia, usado quando largura_faixa <= 0
+            alfa: Peso da amostra mais recente na EWMA (0 < alfa <= 1)
+            largura_faixa: Largura (s) de cada faixa de custo; <= 0 desativa o custo por RTT
+            limiar: Diferença mínima, em faixas, para anunciar um novo custo
+            espera: Tempo mínimo (s) entre dois anúncios motivados por mudança de custo
+        """
+        self.custo_fixo = custo_fixo
+        self.alfa = alfa
+        self.largura_faixa = largura_faixa
+        self.limiar = limiar
+        self.espera = espera
+
+        self.media: Optional[float] = None
+        self.anunciado: Optional[int] = None
+        self.ultimo_anuncio = float('-inf')
+
+    def reiniciar(self) -> None:
+        """Descarta o histórico, usado quando o enlace cai."""
+        self.media = None
+        self.anunciado = None
+        self.ultimo_anuncio = float('-inf')
+
+    def amostra(self, rtt: float) -> None:
+        """
+        Incorpora uma nova medição de RTT à média.
+
+        Args:
+            rtt: RTT medido em segundos
+        """
+        if self.media is None:
+            self.media = rtt
+        else:
+            self.media += self.alfa * (rtt - self.media)
+
+    def custo(self) -> int:
+        """
+        Retorna o custo quantizado correspondente à média atual.
+
+        Returns:
+            Custo inteiro (>= 1)
+        """
+        if self.largura_faixa <= 0 or self.media is None:
+            return self.custo_fixo
+        return max(1, math.ceil(self.media / self.largura_faixa))
+
+    def deve_anunciar(self, agora: float) -> bool:
+        """
+        Indica se o custo mudou o suficiente para justificar um novo LSA.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            True se a diferença atingiu o limiar e o hold-down expirou
+        """
+        if self.anunciado is None:
+            return True
+        if abs(self.custo() - self.anunciado) < self.limiar:
+            return False
+        return agora - self.ultimo_anuncio >= self.espera
+
+    def anunciar(self, agora: float) -> int:
+        """
+        Registra o custo atual como anunciado.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Custo anunciado
+        """
+        self.anunciado = self.custo()
+        self.ultimo_anuncio = agora
+        return self.anunciado
@@ -6,7 +6,120 @@ entre roteadores de rede usando o algoritmo de Dijkstra. Ele processa
 um Banco de Dados de Estado de Link (LSDB) para gerar tabelas de roteamento.
 """
 
-import json
+import heapq
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+def construir_grafo(lsdb: Dict[str, Any]) -> Tuple[List[str], Dict[str, int], List[List[Tuple[int, float]]]]:
+    """
+    Constrói uma representação compacta do grafo indexada por inteiros.
+
+    Cada roteador presente na LSDB recebe um índice e a adjacência passa a ser
+    uma lista de listas de pares (índice_vizinho, custo). Vizinhos anunciados
+    que ainda não possuem LSA na LSDB são ignorados.
+
+    Args:
+        lsdb (dict): Banco de Dados de Estado de Link
+
+    Returns:
+        tuple: (lista de IPs por índice, mapa IP -> índice, lista de adjacência)
+    """
+    ips = list(lsdb)
+    indice = {ip: i for i, ip in enumerate(ips)}
+    adjacencia = []
+    for ip in ips:
+        arestas = []
+        for ip_viz, custo in lsdb[ip]["vizinhos"].values():
+            j = indice.get(ip_viz)
+            if j is not None:
+                arestas.append((j, custo))
+        adjacencia.append(arestas)
+    return ips, indice, adjacencia
+
+
+def spf(origem: int, adjacencia: List[List[Tuple[int, float]]]) -> Tuple[List[float], List[List[int]], List[int]]:
+    """
+    Executa o Dijkstra com heap binário sobre a adjacência indexada.
+
+    Todos os predecessores de mesmo custo são mantidos (ECMP). Os custos
+    configurados são sempre positivos (ver Formatter.formatar_vizinhos); um
+    enlace de custo zero recebido só substitui o predecessor quando melhora a
+    distância, o que mantém o grafo de predecessores acíclico.
+
+    Args:
+        origem (int): Índice do roteador de origem
+        adjacencia (list): Lista de adjacência gerada por construir_grafo
+
+    Returns:
+        tuple: (distâncias, listas de predecessores, ordem em que os nós foram fixados)
+    """
+    n = len(adjacencia)
+    dist = [float('inf')] * n
+    prev: List[List[int]] = [[] for _ in range(n)]
+    fixado = [False] * n
+    ordem = []
+
+    dist[origem] = 0
+    heap = [(0, origem)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if fixado[u]:
+            continue
+        fixado[u] = True
+        ordem.append(u)
+        for v, custo in adjacencia[u]:
+            nd = d + custo
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = [u]
+                heapq.heappush(heap, (nd, v))
+            elif nd == dist[v] and custo > 0 and u not in prev[v]:
+                prev[v].append(u)
+
+    return dist, prev, ordem
+
+
+def proximos_saltos(origem: int, prev: List[List[int]], ordem: List[int]) -> List[Set[int]]:
+    """
+    Calcula os próximos saltos de todos os destinos em uma única passada.
+
+    Como cada nó é fixado depois de todos os seus predecessores, percorrer a
+    ordem de fixação garante que os próximos saltos dos predecessores já estão
+    calculados; o conjunto de um nó é a união dos conjuntos dos predecessores.
+
+    Args:
+        origem (int): Índice do roteador de origem
+        prev (list): Predecessores retornados por spf
+        ordem (list): Ordem de fixação retornada por spf
+
+    Returns:
+        list: Conjunto de índices dos próximos saltos de cada nó (vazio se inalcançável ou origem)
+    """
+    saltos: List[Set[int]] = [set() for _ in prev]
+    for v in ordem:
+        for p in prev[v]:
+            if p == origem:
+                saltos[v].add(v)
+            else:
+                saltos[v] |= saltos[p]
+    return saltos
+
+
+def ordenar_saltos(ips: Any) -> Tuple[str, ...]:
+    """
+    Ordena um conjunto de próximos saltos de forma determinística.
+
+    A mesma ordem é usada pelo SPF e pela leitura da tabela do kernel, para que
+    rotas multipath iguais nunca sejam reinstaladas apenas por ordem diferente.
+
+    Args:
+        ips: IPs dos próximos saltos
+
+    Returns:
+        tuple: IPs ordenados numericamente
+    """
+    return tuple(sorted(ips, key=lambda ip: tuple(int(parte) for parte in ip.split('.'))))
+
 
 def dijkstra(origem, lsdb):
     """
@@ -19,40 +132,355 @@ def dijkstra(origem, lsdb):
                      e suas conexões com custos
     
     Returns:
-        dict: Uma tabela de roteamento mapeando endereços IP de destino para endereços IP de próximo salto
+        dict: Uma tabela de roteamento mapeando endereços IP de destino para a tupla ordenada
+              dos próximos saltos de mesmo custo
     """
-    grafo = {}
-    for router_id, lsa in lsdb.items():
-        vizinhos = {}
-        for viz_entry in lsa["vizinhos"].values():
-            ip_viz, custo = viz_entry
-            if ip_viz in lsdb:
-                vizinhos[ip_viz] = custo
-        grafo[router_id] = vizinhos
-
-    dist = {r: float('inf') for r in grafo}
-    prev = {r: None for r in grafo}
-    dist[origem] = 0
-    visitados = set()
-
-    while len(visitados) < len(grafo):
-        u = min((r for r in grafo if r not in visitados), key=lambda r: dist[r])
-        visitados.add(u)
-        for v, custo in grafo[u].items():
-            if dist[u] + custo < dist[v]:
-                dist[v] = dist[u] + custo
-                prev[v] = u
-
-    tabela = {}
-    for destino in grafo:
-        if destino == origem or prev[destino] is None:
+    ips, indice, adjacencia = construir_grafo(lsdb)
+    if origem not in indice:
+        return {}
+
+    s = indice[origem]
+    _, prev, ordem = spf(s, adjacencia)
+    saltos = proximos_saltos(s, prev, ordem)
+
+    return {ips[v]: ordenar_saltos(ips[j] for j in saltos[v]) for v in ordem if v != s}
+
+
+def alternativas_sem_laco(origem: str, lsdb: Dict[str, Any], tabela: Dict[str, Tuple[str, ...]]) -> Dict[str, str]:
+    """
+    Calcula um próximo salto alternativo livre de laços (LFA) para cada destino com um único próximo salto.
+
+    Um vizinho N serve de alternativa para o destino D quando o seu caminho mais
+    curto até D não volta pela origem S: dist(N, D) < dist(N, S) + dist(S, D).
+    Para isso é executado um SPF a partir de cada vizinho. Entre as alternativas
+    válidas, preferem-se as que também não passam pelo próximo salto primário P
+    (protegem contra a queda do roteador, e não só do enlace) e, depois, as de
+    menor custo total. Destinos com vários próximos saltos (ECMP) não precisam
+    de alternativa: basta retirar o salto que caiu.
+
+    Args:
+        origem (str): Endereço IP do roteador local
+        lsdb (dict): Banco de Dados de Estado de Link
+        tabela (dict): Tabela de roteamento atual (destino -> próximos saltos)
+
+    Returns:
+        dict: Destino -> IP do vizinho alternativo (apenas destinos protegidos)
+    """
+    ips, indice, adjacencia = construir_grafo(lsdb)
+    if origem not in indice:
+        return {}
+
+    s = indice[origem]
+    dist_origem = spf(s, adjacencia)[0]
+    custo_vizinho: Dict[int, float] = {}
+    for j, custo in adjacencia[s]:
+        if j != s and custo < custo_vizinho.get(j, float('inf')):
+            custo_vizinho[j] = custo
+    dist_vizinho = {j: spf(j, adjacencia)[0] for j in custo_vizinho}
+
+    alternativas = {}
+    for destino, saltos in tabela.items():
+        d = indice.get(destino)
+        p = indice.get(saltos[0]) if len(saltos) == 1 else None
+        if d is None or p not in dist_vizinho:
             continue
-        next_hop = destino
-        while prev[next_hop] != origem:
-            next_hop = prev[next_hop]
-        tabela[destino] = next_hop
+        melhor = None
+        for n, dist_n in dist_vizinho.items():
+            if n == p or not dist_n[d] < dist_n[s] + dist_origem[d]:
+                continue
+            protege_no = d != p and dist_n[d] < dist_n[p] + dist_vizinho[p][d]
+            chave = (not protege_no, custo_vizinho[n] + dist_n[d], ips[n])
+            if melhor is None or chave < melhor:
+                melhor = chave
+        if melhor is not None:
+            alternativas[destino] = melhor[2]
+    return alternativas
+
+
+class SPFIncremental:
+    """
+    Mantém o grafo de caminhos mais curtos entre execuções e repara apenas a
+    região afetada quando o LSA de um roteador muda (estilo Ramalingam-Reps).
+
+    Cada nó guarda todos os predecessores de mesmo custo (ECMP). Quando um
+    enlace piora ou desaparece, o predecessor é retirado; somente os nós que
+    ficam sem nenhum predecessor são invalidados e reconectados a partir dos
+    nós não afetados. Quando um enlace melhora, a redução é propagada a partir
+    do seu destino. Os próximos saltos são recalculados apenas para os nós
+    cujo conjunto de predecessores mudou e para seus descendentes.
+    """
+
+    def __init__(self, origem: str):
+        """
+        Inicializa o SPF incremental vazio.
+
+        Args:
+            origem (str): Endereço IP do roteador local (raiz da árvore)
+        """
+        self.origem = origem
+        self.ips: List[str] = []
+        self.indice: Dict[str, int] = {}
+        self.presente: List[bool] = []
+        self.saida: List[Dict[int, float]] = []
+        self.entrada: List[Dict[int, float]] = []
+        self.dist: List[float] = []
+        self.pais: List[Set[int]] = []
+        self.filhos: List[Set[int]] = []
+        self.saltos: List[Set[int]] = []
+        self.tabela: Dict[str, Tuple[str, ...]] = {}
+        # Roteadores cuja distância ou próximos saltos podem ter mudado na última atualização
+        self.revisados: Set[str] = set()
+        # Indica se a última atualização mudou algum enlace ou a presença de algum roteador
+        self.topologia_alterada = False
+        self._raiz = self._obter_indice(origem)
+
+    def _obter_indice(self, ip: str) -> int:
+        """Retorna o índice do roteador, criando-o se ainda não existir."""
+        i = self.indice.get(ip)
+        if i is None:
+            i = len(self.ips)
+            self.indice[ip] = i
+            self.ips.append(ip)
+            self.presente.append(False)
+            self.saida.append({})
+            self.entrada.append({})
+            self.dist.append(float('inf'))
+            self.pais.append(set())
+            self.filhos.append(set())
+            self.saltos.append(set())
+        return i
+
+    def _arestas(self, u: int, lsa: Any) -> Dict[int, float]:
+        """Converte os vizinhos de um LSA em arestas indexadas (menor custo por destino)."""
+        arestas: Dict[int, float] = {}
+        if lsa is None:
+            return arestas
+        for ip_viz, custo in lsa["vizinhos"].values():
+            j = self._obter_indice(ip_viz)
+            if j != u and (j not in arestas or custo < arestas[j]):
+                arestas[j] = custo
+        return arestas
+
+    def distancia(self, ip: str) -> float:
+        """Retorna a distância atual até o roteador (infinito se inalcançável ou desconhecido)."""
+        i = self.indice.get(ip)
+        return float('inf') if i is None else self.dist[i]
+
+    def _definir_pai(self, v: int, p: int) -> None:
+        """Torna p o único predecessor de v, mantendo as listas de filhos coerentes."""
+        self._limpar_pais(v)
+        self.pais[v].add(p)
+        self.filhos[p].add(v)
+
+    def _adicionar_pai(self, v: int, p: int) -> None:
+        """Acrescenta p aos predecessores de mesmo custo de v."""
+        self.pais[v].add(p)
+        self.filhos[p].add(v)
+
+    def _remover_pai(self, v: int, p: int) -> None:
+        """Retira p dos predecessores de v."""
+        self.pais[v].discard(p)
+        self.filhos[p].discard(v)
+
+    def _limpar_pais(self, v: int) -> None:
+        """Retira todos os predecessores de v."""
+        for p in self.pais[v]:
+            self.filhos[p].discard(v)
+        self.pais[v].clear()
+
+    def carregar(self, lsdb: Dict[str, Any]) -> Dict[str, Optional[Tuple[str, ...]]]:
+        """
+        Reconstrói todo o grafo de caminhos a partir de uma LSDB completa.
+
+        Args:
+            lsdb (dict): Banco de Dados de Estado de Link
+
+        Returns:
+            dict: Destinos cuja rota mudou (destino -> próximos saltos, None se removido)
+        """
+        for u in range(len(self.ips)):
+            self.presente[u] = False
+            self.saida[u] = {}
+            self.entrada[u] = {}
+        for ip, lsa in lsdb.items():
+            u = self._obter_indice(ip)
+            self.presente[u] = True
+            self.saida[u] = self._arestas(u, lsa)
+        for u, arestas in enumerate(self.saida):
+            for j, custo in arestas.items():
+                self.entrada[j][u] = custo
+        self.topologia_alterada = True
+
+        for v in range(len(self.ips)):
+            self.dist[v] = float('inf')
+            self._limpar_pais(v)
+        heap = []
+        if self.presente[self._raiz]:
+            self.dist[self._raiz] = 0
+            heap.append((0, self._raiz))
+        self._propagar(heap, set())
+        return self._atualizar_saltos(set(range(len(self.ips))))
+
+    def atualizar(self, origem_lsa: str, lsa: Optional[Dict[str, Any]]) -> Dict[str, Optional[Tuple[str, ...]]]:
+        """
+        Aplica a mudança do LSA de um roteador e repara o grafo de caminhos.
+
+        Args:
+            origem_lsa (str): IP do roteador que originou o LSA
+            lsa (dict | None): Novo LSA, ou None se o roteador saiu da LSDB
+
+        Returns:
+            dict: Destinos cuja rota mudou (destino -> próximos saltos, None se removido)
+        """
+        u = self._obter_indice(origem_lsa)
+        estava_presente = self.presente[u]
+        antigas = self.saida[u]
+        novas = self._arestas(u, lsa)
+
+        for j in antigas:
+            del self.entrada[j][u]
+        for j, custo in novas.items():
+            self.entrada[j][u] = custo
+        self.saida[u] = novas
+        self.presente[u] = lsa is not None
+        self.topologia_alterada = novas != antigas or estava_presente != self.presente[u]
+
+        # Enlaces que pioraram ou sumiram deixam de ser predecessores; quem fica sem nenhum é afetado
+        alterados = set()
+        raizes = []
+        for j in antigas:
+            if u in self.pais[j] and (j not in novas or novas[j] > antigas[j]):
+                self._remover_pai(j, u)
+                alterados.add(j)
+                if not self.pais[j]:
+                    raizes.append(j)
+        if estava_presente and lsa is None:
+            raizes.append(u)
+
+        # Invalida os nós que perderam todos os predecessores, em cascata
+        afetados = set()
+        pilha = raizes
+        while pilha:
+            v = pilha.pop()
+            if v in afetados:
+                continue
+            afetados.add(v)
+            self.dist[v] = float('inf')
+            self._limpar_pais(v)
+            for x in list(self.filhos[v]):
+                self._remover_pai(x, v)
+                alterados.add(x)
+                if not self.pais[x]:
+                    pilha.append(x)
+
+        # Reconecta os afetados a partir dos nós cujas distâncias continuam válidas
+        heap = []
+        if not estava_presente and self.presente[u]:
+            afetados.add(u)
+        for v in afetados:
+            if not self.presente[v]:
+                continue
+            if v == self._raiz:
+                self.dist[v] = 0
+                heap.append((0, v))
+                continue
+            for p, custo in self.entrada[v].items():
+                d = self.dist[p] + custo
+                if d < self.dist[v]:
+                    self.dist[v] = d
+                    self._definir_pai(v, p)
+                elif d == self.dist[v] and d != float('inf') and custo > 0:
+                    self._adicionar_pai(v, p)
+            if self.dist[v] != float('inf'):
+                heap.append((self.dist[v], v))
+        alterados |= afetados
+
+        # Enlaces que melhoraram ou surgiram: novo caminho mais curto ou de mesmo custo
+        for j, custo in novas.items():
+            if not self.presente[j] or j in afetados:
+                continue
+            d = self.dist[u] + custo
+            if d < self.dist[j]:
+                self.dist[j] = d
+                self._definir_pai(j, u)
+                heap.append((d, j))
+                alterados.add(j)
+            elif d == self.dist[j] and d != float('inf') and custo > 0 and u not in self.pais[j]:
+                self._adicionar_pai(j, u)
+                alterados.add(j)
+
+        heapq.heapify(heap)
+        self._propagar(heap, alterados)
+        return self._atualizar_saltos(alterados)
+
+    def _propagar(self, heap: list, alterados: set) -> None:
+        """Executa o Dijkstra a partir das sementes do heap, registrando os nós alterados."""
+        dist = self.dist
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d != dist[v]:
+                continue
+            for x, custo in self.saida[v].items():
+                if not self.presente[x]:
+                    continue
+                nd = d + custo
+                if nd < dist[x]:
+                    dist[x] = nd
+                    self._definir_pai(x, v)
+                    alterados.add(x)
+                    heapq.heappush(heap, (nd, x))
+                elif nd == dist[x] and custo > 0 and v not in self.pais[x]:
+                    self._adicionar_pai(x, v)
+                    alterados.add(x)
+
+    def _atualizar_saltos(self, alterados: set) -> Dict[str, Optional[Tuple[str, ...]]]:
+        """
+        Recalcula os próximos saltos dos nós alterados e de seus descendentes.
+
+        Args:
+            alterados (set): Índices cujos predecessores ou distância mudaram
+
+        Returns:
+            dict: Destinos cuja rota mudou (destino -> próximos saltos, None se removido)
+        """
+        # Reúne os nós alterados e seus descendentes, cujos próximos saltos podem ter mudado
+        regiao = set()
+        pilha = list(alterados)
+        while pilha:
+            v = pilha.pop()
+            if v not in regiao:
+                regiao.add(v)
+                pilha.extend(self.filhos[v])
+
+        self.revisados = {self.ips[v] for v in regiao}
+
+        # Ordem topológica da região: um nó é processado depois de todos os seus predecessores nela
+        pendentes = {v: sum(1 for p in self.pais[v] if p in regiao) for v in regiao}
+        fila = [v for v, n in pendentes.items() if n == 0]
+        mudancas: Dict[str, Optional[Tuple[str, ...]]] = {}
+        while fila:
+            v = fila.pop()
+            saltos = set()
+            for p in self.pais[v]:
+                if p == self._raiz:
+                    saltos.add(v)
+                else:
+                    saltos |= self.saltos[p]
+            self.saltos[v] = saltos
+            for x in self.filhos[v]:
+                pendentes[x] -= 1
+                if pendentes[x] == 0:
+                    fila.append(x)
 
-    return tabela
+            destino = self.ips[v]
+            novo = ordenar_saltos(self.ips[j] for j in saltos) if saltos else None
+            if self.tabela.get(destino) != novo:
+                if novo is None:
+                    del self.tabela[destino]
+                else:
+                    self.tabela[destino] = novo
+                mudancas[destino] = novo
+        return mudancas
 
 
 if __name__ == "__main__":
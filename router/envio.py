@@ -0,0 +1,197 @@
+"""
+Envio em Lote de Datagramas
+---------------------------
+Este módulo agrupa o tráfego de inundação por vizinho: as LSAs a enviar
+entram em uma fila de saída por vizinho (uma cópia por origem, a mais
+recente) e são esvaziadas por um temporizador curto, que empacota várias
+LSAs por datagrama até a MTU do caminho. Os datagramas de uma rodada são
+entregues ao kernel com uma única chamada `sendmmsg` (via ctypes) quando a
+plataforma oferece essa chamada, ou com um `sendto` por datagrama caso
+contrário.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import socket
+import struct
+from typing import Any, Dict, List, Tuple
+
+# Opção IP_MTU do Linux: MTU do caminho de um socket conectado
+IP_MTU = 14
+# MTU assumida quando a do caminho não pode ser descoberta
+MTU_PADRAO = 1500
+# Cabeçalhos IPv4 e UDP descontados da MTU
+CABECALHOS_IP_UDP = 28
+# Limite de mensagens por chamada sendmmsg (UIO_MAXIOV)
+MENSAGENS_POR_CHAMADA = 1024
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _carregar_sendmmsg():
+    """Retorna a função sendmmsg da libc, ou None se indisponível."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError, TypeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+
+_sendmmsg = _carregar_sendmmsg()
+
+
+def mtu_caminho(ip: str) -> int:
+    """
+    Descobre a MTU do caminho até um IP conectando um socket UDP (sem enviar dados).
+
+    Args:
+        ip: Endereço de destino
+
+    Returns:
+        MTU em bytes, ou MTU_PADRAO se não for possível descobri-la
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect((ip, 9))
+            return sock.getsockopt(socket.IPPROTO_IP, IP_MTU)
+    except OSError:
+        return MTU_PADRAO
+
+
+class EnvioEmLote:
+    """Classe que envia vários datagramas UDP com o menor número de chamadas ao sistema."""
+
+    def __init__(self, transporte: asyncio.DatagramTransport):
+        """
+        Args:
+            transporte: Transporte UDP do roteador; seu socket é usado pelo sendmmsg
+        """
+        self.transporte = transporte
+        self.fd = transporte.get_extra_info("socket").fileno()
+        self.chamadas = 0
+        self.datagramas = 0
+
+    def enviar(self, mensagens: List[Tuple[bytes, Tuple[str, int]]]) -> None:
+        """
+        Envia os datagramas informados.
+
+        Mensagens que o kernel não aceitar de imediato (buffer cheio) seguem pelo
+        transporte, que as enfileira.
+
+        Args:
+            mensagens: Lista de (datagrama, (ip, porta))
+        """
+        self.datagramas += len(mensagens)
+        enviadas = 0
+        if _sendmmsg is not None:
+            while enviadas < len(mensagens):
+                lote = mensagens[enviadas:enviadas + MENSAGENS_POR_CHAMADA]
+                resultado = self._sendmmsg(lote)
+                self.chamadas += 1
+                if resultado <= 0:
+                    break
+                enviadas += resultado
+                if resultado < len(lote):
+                    break
+
+        for dados, destino in mensagens[enviadas:]:
+            self.transporte.sendto(dados, destino)
+            self.chamadas += 1
+
+    def _sendmmsg(self, mensagens: List[Tuple[bytes, Tuple[str, int]]]) -> int:
+        """Envia um lote com uma única chamada sendmmsg; retorna quantas mensagens o kernel aceitou."""
+        quantidade = len(mensagens)
+        cabecalhos = (_MMsgHdr * quantidade)()
+        iovecs = (_IOVec * quantidade)()
+        # Mantém os buffers vivos até o fim da chamada
+        buffers = []
+        for i, (dados, (ip, porta)) in enumerate(mensagens):
+            endereco = ctypes.create_string_buffer(
+                struct.pack("=H2s4s8x", socket.AF_INET, porta.to_bytes(2, "big"), socket.inet_aton(ip)))
+            conteudo = ctypes.c_char_p(dados)
+            buffers.append((endereco, conteudo))
+
+            iovecs[i].iov_base = ctypes.cast(conteudo, ctypes.c_void_p)
+            iovecs[i].iov_len = len(dados)
+            cabecalho = cabecalhos[i].msg_hdr
+            cabecalho.msg_name = ctypes.cast(endereco, ctypes.c_void_p)
+            cabecalho.msg_namelen = 16
+            cabecalho.msg_iov = ctypes.pointer(iovecs[i])
+            cabecalho.msg_iovlen = 1
+        return _sendmmsg(self.fd, cabecalhos, quantidade, socket.MSG_DONTWAIT)
+
+
+class FilasSaida:
+    """Classe que mantém, por vizinho, as LSAs aguardando o próximo envio."""
+
+    def __init__(self, mtu: int = 0):
+        """
+        Args:
+            mtu: MTU (bytes) usada para empacotar as LSAs; 0 descobre a MTU do caminho de cada vizinho
+        """
+        self.mtu = mtu
+        self.filas: Dict[str, Dict[str, Dict[str, Any]]] = {}  # vizinho -> origem -> LSA
+        self.mtus: Dict[str, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.filas)
+
+    def enfileirar(self, vizinho: str, lsa: Dict[str, Any]) -> None:
+        """
+        Coloca uma LSA na fila de um vizinho, substituindo uma cópia mais antiga da mesma origem.
+
+        Args:
+            vizinho: IP do vizinho
+            lsa: LSA a enviar
+        """
+        fila = self.filas.setdefault(vizinho, {})
+        atual = fila.get(lsa["id"])
+        if atual is None or lsa["seq"] >= atual["seq"]:
+            fila[lsa["id"]] = lsa
+
+    def tamanho_maximo(self, vizinho: str) -> int:
+        """
+        Retorna o maior datagrama (carga UDP) que cabe na MTU do caminho até o vizinho.
+
+        Args:
+            vizinho: IP do vizinho
+
+        Returns:
+            Tamanho máximo em bytes
+        """
+        mtu = self.mtu or self.mtus.get(vizinho)
+        if mtu is None:
+            mtu = self.mtus[vizinho] = mtu_caminho(vizinho)
+        return mtu - CABECALHOS_IP_UDP
+
+    def retirar(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Retorna e esvazia todas as filas.
+
+        Returns:
+            Dicionário {vizinho: [LSAs]}
+        """
+        filas, self.filas = self.filas, {}
+        return {vizinho: list(fila.values()) for vizinho, fila in filas.items()}
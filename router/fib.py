@@ -0,0 +1,101 @@
+"""
+Tabela de Encaminhamento em Memória (FIB Sombra)
+------------------------------------------------
+Este módulo mantém uma cópia autoritativa, em memória, das rotas instaladas
+pelo roteador. Como o processo do roteador é o único que escreve essas rotas,
+as saídas do SPF são comparadas com a cópia em O(rotas alteradas), sem ler e
+interpretar a tabela do kernel a cada recálculo. A reconciliação com o kernel
+acontece apenas periodicamente ou quando uma alteração externa é notificada.
+
+Cada rota guarda a tupla ordenada dos seus próximos saltos (mais de um quando
+há caminhos de mesmo custo), de modo que duas rotas ECMP com o mesmo conjunto
+de saltos são iguais independentemente da ordem em que foram calculadas.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class FIB:
+    """Classe que mantém a FIB sombra e programa apenas as diferenças no kernel."""
+
+    def __init__(self,
+                 listar: Callable[[], Tuple[Dict[str, Tuple[str, ...]], Dict[str, Any]]],
+                 aplicar: Callable[[Dict[str, Tuple[str, ...]], Dict[str, Tuple[str, ...]], Dict[str, Tuple[str, ...]]], None]):
+        """
+        Inicializa a FIB sombra vazia.
+
+        Args:
+            listar: Função que lê o kernel e retorna (rotas com próximos saltos, rotas conectadas)
+            aplicar: Função que programa no kernel (rotas a adicionar, remover, substituir)
+        """
+        self.listar = listar
+        self.aplicar = aplicar
+        self.rotas: Dict[str, Tuple[str, ...]] = {}
+        self.conectadas = set()
+        self.reconciliacoes = 0
+        self.lock = threading.Lock()
+        self.aquisicoes = 0
+        self.espera_lock = 0.0  # Tempo total (s) gasto aguardando o lock
+
+    @contextmanager
+    def _travar(self) -> Iterator[None]:
+        """Adquire o lock da FIB, contabilizando o tempo de espera."""
+        inicio = time.perf_counter()
+        with self.lock:
+            self.espera_lock += time.perf_counter() - inicio
+            self.aquisicoes += 1
+            yield
+
+    def atualizar(self, alteracoes: Dict[str, Optional[Tuple[str, ...]]]) -> None:
+        """
+        Aplica as rotas que mudaram desde o último recálculo.
+
+        Args:
+            alteracoes: Rede -> novos próximos saltos (tupla ordenada), ou None para remover a rota
+        """
+        rotas_adicionar = {}
+        rotas_remover = {}
+        rotas_replase = {}
+
+        with self._travar():
+            for rede, proximo_salto in alteracoes.items():
+                atual = self.rotas.get(rede)
+                if proximo_salto is None:
+                    if atual is not None:
+                        rotas_remover[rede] = atual
+                        del self.rotas[rede]
+                elif rede in self.conectadas or atual == proximo_salto:
+                    continue
+                else:
+                    if atual is None:
+                        rotas_adicionar[rede] = proximo_salto
+                    else:
+                        rotas_replase[rede] = proximo_salto
+                    self.rotas[rede] = proximo_salto
+
+            if rotas_adicionar or rotas_remover or rotas_replase:
+                self.aplicar(rotas_adicionar, rotas_remover, rotas_replase)
+
+    def reconciliar(self) -> None:
+        """Lê a tabela do kernel e corrige qualquer divergência em relação à FIB sombra."""
+        with self._travar():
+            rotas_existentes, rotas_sistema = self.listar()
+            self.conectadas = set(rotas_sistema)
+            for rede in self.conectadas.intersection(self.rotas):
+                del self.rotas[rede]
+
+            rotas_adicionar = {}
+            rotas_replase = {}
+            for rede, proximo_salto in self.rotas.items():
+                if rede not in rotas_existentes:
+                    rotas_adicionar[rede] = proximo_salto
+                elif rotas_existentes[rede] != proximo_salto:
+                    rotas_replase[rede] = proximo_salto
+            rotas_remover = {rede: proximo_salto for rede, proximo_salto in rotas_existentes.items() if rede not in self.rotas}
+
+            if rotas_adicionar or rotas_remover or rotas_replase:
+                self.aplicar(rotas_adicionar, rotas_remover, rotas_replase)
+            self.reconciliacoes += 1
@@ -5,31 +5,100 @@ Este módulo fornece funções e classes para formatação de dados
 utilizados pelo roteador na implementação do algoritmo de estado de enlace.
 """
 
+# Maior identificador de área: a área viaja em um byte no cabeçalho dos pacotes
+AREA_MAXIMA = 255
+# Maior idade de uma LSA (s): a idade viaja em dois bytes no registro de cada LSA
+IDADE_MAXIMA = 65535
+
 class Formatter:
     """Classe para formatação de dados do roteador."""
     
+    @staticmethod
+    def _separar_vizinhos(vizinhos_str: str) -> list[list[str]]:
+        """Divide a string de vizinhos nos campos de cada vizinho, já sem espaços."""
+        if not vizinhos_str:
+            return []
+        return [[parte.strip() for parte in vizinho.split(",")] for vizinho in vizinhos_str.strip("[]").split("],[")]
+    
     @staticmethod
     def formatar_vizinhos(vizinhos_str: str) -> dict[str, tuple[str, int]]:
         """
         Formata a string de vizinhos em um dicionário estruturado.
         
         Args:
-            vizinhos_str (str): String no formato "[router1, 172.20.1.2, 1],[router3, 172.20.3.2, 1]"
+            vizinhos_str (str): String no formato "[router1, 172.20.1.2, 1],[router3, 172.20.3.2, 1]";
+                cada vizinho pode trazer um quarto campo com a área do enlace (ver formatar_areas)
             
         Returns:
             dict: Dicionário formatado com vizinhos no formato {nome: (ip, custo)}
+            
+        Raises:
+            ValueError: Se algum custo não for positivo (enlaces de custo zero tornariam
+                ambíguos os empates de ECMP entre o SPF completo e o incremental)
         """
         vizinhos_dict = {}
-        if not vizinhos_str:
-            return vizinhos_dict
-            
-        vizinhos = vizinhos_str.strip("[]").split("],[")
-
-        for vizinho in vizinhos:
-            partes = vizinho.split(",")
-            nome = partes[0].strip()
-            ip = partes[1].strip()
-            custo = int(partes[2].strip())
+        for partes in Formatter._separar_vizinhos(vizinhos_str):
+            nome = partes[0]
+            ip = partes[1]
+            custo = int(partes[2])
+            if custo <= 0:
+                raise ValueError(f"Custo {custo} inválido para o vizinho {nome}: os custos devem ser positivos")
             vizinhos_dict[nome] = (ip, custo)
 
         return vizinhos_dict
+    
+    @staticmethod
+    def formatar_areas(vizinhos_str: str) -> dict[str, int]:
+        """
+        Extrai a área de cada vizinho da string de vizinhos.
+        
+        Args:
+            vizinhos_str (str): String no formato "[router1, 172.20.1.2, 1, 0],[router3, 172.20.3.2, 1, 2]";
+                vizinhos sem o quarto campo pertencem à área 0 (backbone)
+            
+        Returns:
+            dict: Dicionário no formato {nome: área}
+            
+        Raises:
+            ValueError: Se alguma área estiver fora do intervalo 0-255
+        """
+        return {
+            partes[0]: Formatter.validar_area(int(partes[3])) if len(partes) > 3 else 0
+            for partes in Formatter._separar_vizinhos(vizinhos_str)
+        }
+    
+    @staticmethod
+    def validar_area(area: int) -> int:
+        """
+        Verifica se o identificador de área cabe no cabeçalho dos pacotes.
+        
+        Args:
+            area (int): Identificador da área
+            
+        Returns:
+            int: A própria área
+            
+        Raises:
+            ValueError: Se a área estiver fora do intervalo 0-255
+        """
+        if not 0 <= area <= AREA_MAXIMA:
+            raise ValueError(f"Área {area} inválida: as áreas devem estar entre 0 e {AREA_MAXIMA}")
+        return area
+    
+    @staticmethod
+    def validar_idade_maxima(idade: float) -> float:
+        """
+        Verifica se a idade máxima (MaxAge) das LSAs cabe no registro binário.
+        
+        Args:
+            idade (float): Idade máxima em segundos
+            
+        Returns:
+            float: A própria idade
+            
+        Raises:
+            ValueError: Se a idade estiver fora do intervalo (0, 65535]
+        """
+        if not 0 < idade <= IDADE_MAXIMA:
+            raise ValueError(f"Idade máxima {idade} inválida: deve ser positiva e no máximo {IDADE_MAXIMA} segundos")
+        return idade
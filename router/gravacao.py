@@ -0,0 +1,79 @@
+"""
+Gravação do Estado em Disco
+---------------------------
+Este módulo grava em segundo plano os arquivos JSON com a LSDB e as rotas do
+roteador. Cada recálculo apenas entrega o estado mais recente ao gravador,
+sem tocar no disco; uma tarefa do laço de eventos grava no máximo uma vez por
+intervalo, só os arquivos cujo conteúdo mudou, em JSON compacto e de forma
+atômica (arquivo temporário + rename), com a codificação e a escrita em uma
+thread auxiliar para não atrasar o recebimento de pacotes.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+
+def _gravar_atomico(caminho: str, conteudo: bytes) -> None:
+    """Grava o conteúdo em um arquivo temporário e o renomeia sobre o destino."""
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as file:
+        file.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+class GravadorEstado:
+    """Classe que agrupa as atualizações de estado e as grava periodicamente em disco."""
+
+    def __init__(self, intervalo: float, ao_falhar: Optional[Callable[[str, Exception], None]] = None):
+        """
+        Args:
+            intervalo: Tempo mínimo (s) entre duas rodadas de gravação
+            ao_falhar: Chamada com (caminho, erro) quando um arquivo não pode ser gravado
+        """
+        self.intervalo = intervalo
+        self.ao_falhar = ao_falhar
+        self.pendentes: Dict[str, Any] = {}  # caminho -> estado mais recente ainda não gravado
+        self.gravados: Dict[str, bytes] = {}  # caminho -> conteúdo da última gravação
+        self.evento = asyncio.Event()
+        self.gravacoes = 0
+        self.inalterados = 0
+
+    def atualizar(self, caminho: str, estado: Any) -> None:
+        """
+        Registra o estado mais recente de um arquivo, substituindo o que ainda não foi gravado.
+
+        O estado não deve ser alterado depois de entregue: ele é codificado em outra thread.
+
+        Args:
+            caminho: Arquivo de destino
+            estado: Objeto serializável em JSON
+        """
+        self.pendentes[caminho] = estado
+        self.evento.set()
+
+    def _gravar(self, pendentes: Dict[str, Any]) -> None:
+        """Codifica e grava os arquivos cujo conteúdo mudou desde a última gravação."""
+        for caminho, estado in pendentes.items():
+            try:
+                conteudo = json.dumps(estado, separators=(",", ":")).encode()
+                if self.gravados.get(caminho) == conteudo:
+                    self.inalterados += 1
+                    continue
+                _gravar_atomico(caminho, conteudo)
+                self.gravados[caminho] = conteudo
+                self.gravacoes += 1
+            except Exception as e:
+                if self.ao_falhar is not None:
+                    self.ao_falhar(caminho, e)
+
+    async def laco(self) -> None:
+        """Tarefa do gravador; deve ser executada no laço de eventos do roteador."""
+        while True:
+            await self.evento.wait()
+            self.evento.clear()
+            pendentes, self.pendentes = self.pendentes, {}
+            await asyncio.to_thread(self._gravar, pendentes)
+            # Atualizações que chegarem durante a espera são agrupadas na próxima rodada
+            await asyncio.sleep(self.intervalo)
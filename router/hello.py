@@ -0,0 +1,192 @@
+"""
+Protocolo Hello para Detecção de Vizinhos
+-----------------------------------------
+Este módulo mantém o estado dos vizinhos configurados a partir de pacotes
+HELLO trocados no próprio socket LSA, sem criar processos `ping`. Cada HELLO
+leva um número de sequência e o instante de envio; o vizinho devolve ambos na
+resposta, o que confirma a comunicação nos dois sentidos e fornece o RTT.
+Um vizinho é considerado inativo quando nenhuma resposta chega dentro do
+intervalo morto. O custo anunciado de cada enlace vem de CustoEnlace, que
+suaviza e quantiza o RTT.
+
+Cada vizinho passa pelos estados de adjacência INATIVA -> TROCA -> COMPLETA:
+ao ficar ativo, os dois lados trocam resumos da LSDB (DBD) e pedem (LSR)
+apenas as LSAs que faltam; a adjacência fica completa quando o vizinho
+confirmou o resumo enviado e todas as LSAs pedidas chegaram.
+
+Cada enlace pertence a uma área; a LSDB trocada com o vizinho e as LSAs
+inundadas para ele são as da área do enlace.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from custo_enlace import CustoEnlace
+
+# Estados da adjacência com um vizinho
+ADJ_INATIVA = "inativa"
+ADJ_TROCA = "troca"
+ADJ_COMPLETA = "completa"
+
+
+class Vizinho:
+    """Estado de adjacência de um vizinho configurado."""
+
+    def __init__(self, nome: str, ip: str, custo: CustoEnlace, area: int = 0):
+        """
+        Args:
+            nome: Nome do vizinho na configuração (ex: router2)
+            ip: IP (identificador) do vizinho
+            custo: Métrica do enlace com o vizinho
+            area: Área do enlace com o vizinho
+        """
+        self.nome = nome
+        self.ip = ip
+        self.custo = custo
+        self.area = area
+        self.estado = ADJ_INATIVA
+        self.ultimo_visto = float('-inf')
+        self.rtt: Optional[float] = None
+        self.reiniciar_sincronizacao()
+
+    @property
+    def ativo(self) -> bool:
+        """Indica se o vizinho responde aos HELLOs."""
+        return self.estado != ADJ_INATIVA
+
+    def reiniciar_sincronizacao(self) -> None:
+        """Descarta o andamento da troca de resumos da LSDB com o vizinho."""
+        self.dbd_confirmado = False  # O vizinho respondeu ao nosso DBD com um LSR
+        self.pedidos: Dict[str, int] = {}  # origem -> sequência pedida e ainda não recebida
+        self.ultima_sincronizacao = float('-inf')  # Último envio de DBD ou LSR
+
+
+class TabelaVizinhos:
+    """Classe que acompanha HELLOs enviados e respostas recebidas de cada vizinho."""
+
+    def __init__(self, vizinhos: Dict[str, Tuple[str, int]], intervalo_hello: float, intervalo_morto: float,
+                 alfa: float = 0.2, largura_faixa: float = 0.001, limiar: int = 2, espera: float = 10.0,
+                 areas: Optional[Dict[str, int]] = None):
+        """
+        Inicializa a tabela com os vizinhos configurados, todos inativos.
+
+        Args:
+            vizinhos: Vizinhos configurados {nome: (ip, custo)}
+            intervalo_hello: Intervalo (s) entre HELLOs enviados a cada vizinho
+            intervalo_morto: Tempo (s) sem respostas após o qual o vizinho é considerado inativo
+            alfa: Peso da amostra mais recente na EWMA do RTT
+            largura_faixa: Largura (s) de cada faixa de custo; <= 0 usa o custo configurado
+            limiar: Diferença mínima, em faixas, para anunciar um novo custo
+            espera: Tempo mínimo (s) entre anúncios motivados por mudança de custo
+            areas: Área do enlace com cada vizinho {nome: área}; ausentes ficam na área 0
+        """
+        self.intervalo_hello = intervalo_hello
+        self.intervalo_morto = intervalo_morto
+        areas = areas or {}
+        self.vizinhos = {
+            ip: Vizinho(nome, ip, CustoEnlace(custo, alfa, largura_faixa, limiar, espera), areas.get(nome, 0))
+            for nome, (ip, custo) in vizinhos.items()
+        }
+        self.enderecos: Dict[str, str] = {}  # IP de interface de origem -> IP do vizinho
+        self.seq = 0
+
+    def proximo_seq(self) -> int:
+        """Retorna a sequência do próximo HELLO."""
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return self.seq
+
+    def identificar(self, endereco: str) -> Optional[str]:
+        """
+        Mapeia o endereço de origem de um datagrama para o vizinho que o enviou.
+
+        Args:
+            endereco: IP de origem do datagrama (interface do vizinho)
+
+        Returns:
+            IP (identificador) do vizinho, ou None se desconhecido
+        """
+        if endereco in self.vizinhos:
+            return endereco
+        return self.enderecos.get(endereco)
+
+    def associar(self, endereco: str, remetente: str) -> None:
+        """
+        Registra o endereço de origem usado por um vizinho, visto em um HELLO recebido.
+
+        Args:
+            endereco: IP de origem do datagrama
+            remetente: IP (identificador) informado no HELLO
+        """
+        if remetente in self.vizinhos:
+            self.enderecos[endereco] = remetente
+
+    def registrar_resposta(self, remetente: str, endereco: str, carimbo: float, agora: float) -> bool:
+        """
+        Registra a resposta de um vizinho a um HELLO enviado por este roteador.
+
+        Args:
+            remetente: IP (identificador) do vizinho que respondeu
+            endereco: IP de origem do datagrama de resposta
+            carimbo: Instante de envio do HELLO, ecoado pelo vizinho
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            True se o vizinho passou de inativo para ativo
+        """
+        vizinho = self.vizinhos.get(remetente)
+        if vizinho is None:
+            return False
+        self.enderecos[endereco] = remetente
+        vizinho.ultimo_visto = agora
+        vizinho.rtt = max(agora - carimbo, 0.0)
+        vizinho.custo.amostra(vizinho.rtt)
+        if not vizinho.ativo:
+            vizinho.estado = ADJ_TROCA
+            return True
+        return False
+
+    def verificar_inativos(self, agora: float) -> List[Vizinho]:
+        """
+        Marca como inativos os vizinhos sem resposta dentro do intervalo morto.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Vizinhos que acabaram de ficar inativos
+        """
+        inativos = []
+        for vizinho in self.vizinhos.values():
+            if vizinho.ativo and agora - vizinho.ultimo_visto > self.intervalo_morto:
+                vizinho.estado = ADJ_INATIVA
+                vizinho.reiniciar_sincronizacao()
+                vizinho.rtt = None
+                vizinho.custo.reiniciar()
+                inativos.append(vizinho)
+        return inativos
+
+    def custos_alterados(self, agora: float) -> bool:
+        """
+        Indica se o custo de algum vizinho ativo mudou além da histerese.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            True se um novo LSA deve ser anunciado
+        """
+        return any(v.custo.deve_anunciar(agora) for v in self.vizinhos.values() if v.ativo)
+
+    def anunciar(self, agora: float) -> Dict[int, Dict[str, Tuple[str, int]]]:
+        """
+        Retorna os vizinhos ativos no formato usado pelo LSA, registrando os custos como anunciados.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Dicionário {área: {nome: (ip, custo)}}, só com as áreas que têm vizinhos ativos
+        """
+        anunciados: Dict[int, Dict[str, Tuple[str, int]]] = {}
+        for v in self.vizinhos.values():
+            if v.ativo:
+                anunciados.setdefault(v.area, {})[v.nome] = (v.ip, v.custo.anunciar(agora))
+        return anunciados
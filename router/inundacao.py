@@ -0,0 +1,165 @@
+"""
+Inundação Confiável de LSAs
+---------------------------
+Este módulo acompanha, para cada vizinho, as LSAs enviadas e ainda não
+confirmadas (lista de retransmissão) e as confirmações que este roteador
+deve enviar. Uma LSA permanece na lista até o vizinho confirmá-la com um
+LS-Ack, ou implicitamente ao enviar uma cópia igual ou mais recente, e é
+reenviada a cada intervalo de retransmissão. As confirmações não são
+enviadas uma a uma: acumulam-se por um curto atraso e seguem agrupadas em um
+único pacote por vizinho.
+
+Toda cópia, confirmação ou resumo da LSDB recebido de um vizinho também
+registra a maior sequência que ele sabidamente possui de cada origem, o que
+permite deixar de enviar a ele LSAs que ele já tem.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class Inundacao:
+    """Classe que mantém as listas de retransmissão e as confirmações pendentes."""
+
+    def __init__(self, intervalo_retransmissao: float):
+        """
+        Args:
+            intervalo_retransmissao: Tempo (s) sem confirmação após o qual uma LSA é reenviada
+        """
+        self.intervalo_retransmissao = intervalo_retransmissao
+        # vizinho -> origem -> (LSA, instante do próximo reenvio)
+        self.retransmissao: Dict[str, Dict[str, Tuple[Dict[str, Any], float]]] = {}
+        # endereço de origem do datagrama -> LSAs a confirmar (origem, sequência)
+        self.acks: Dict[str, List[Tuple[str, int]]] = {}
+        # vizinho -> origem -> maior sequência que o vizinho sabidamente possui
+        self.conhecidas: Dict[str, Dict[str, int]] = {}
+
+    def enfileirar(self, vizinho: str, lsa: Dict[str, Any], agora: float) -> None:
+        """
+        Registra uma LSA enviada a um vizinho, substituindo uma cópia mais antiga da mesma origem.
+
+        Args:
+            vizinho: IP (identificador) do vizinho
+            lsa: LSA enviada
+            agora: Instante atual (time.monotonic)
+        """
+        self.retransmissao.setdefault(vizinho, {})[lsa["id"]] = (lsa, agora + self.intervalo_retransmissao)
+
+    def confirmar(self, vizinho: str, chaves: List[Tuple[str, int]]) -> int:
+        """
+        Registra as LSAs que um vizinho possui e as remove da sua lista de retransmissão.
+
+        Args:
+            vizinho: IP (identificador) do vizinho
+            chaves: Lista de (origem, sequência) confirmadas
+
+        Returns:
+            Quantidade de LSAs removidas da lista
+        """
+        conhecidas = self.conhecidas.setdefault(vizinho, {})
+        for origem, seq in chaves:
+            if seq > conhecidas.get(origem, -1):
+                conhecidas[origem] = seq
+
+        pendentes = self.retransmissao.get(vizinho)
+        if not pendentes:
+            return 0
+        removidas = 0
+        for origem, seq in chaves:
+            pendente = pendentes.get(origem)
+            if pendente is not None and seq >= pendente[0]["seq"]:
+                del pendentes[origem]
+                removidas += 1
+        return removidas
+
+    def conhece(self, vizinho: str, origem: str, seq: int) -> bool:
+        """
+        Indica se um vizinho já possui uma LSA igual ou mais recente.
+
+        Args:
+            vizinho: IP (identificador) do vizinho
+            origem: Roteador de origem da LSA
+            seq: Número de sequência da LSA
+
+        Returns:
+            True se não há necessidade de enviar a LSA ao vizinho
+        """
+        return self.conhecidas.get(vizinho, {}).get(origem, -1) >= seq
+
+    def esquecer(self, vizinho: str, origens: List[str]) -> None:
+        """
+        Descarta o que se sabia sobre LSAs que o vizinho pediu explicitamente.
+
+        Args:
+            vizinho: IP (identificador) do vizinho
+            origens: Origens das LSAs pedidas
+        """
+        conhecidas = self.conhecidas.get(vizinho, {})
+        for origem in origens:
+            conhecidas.pop(origem, None)
+
+    def descartar_vizinho(self, vizinho: str) -> None:
+        """
+        Esquece a lista de retransmissão e as LSAs conhecidas de um vizinho que ficou inativo.
+
+        Args:
+            vizinho: IP (identificador) do vizinho
+        """
+        self.retransmissao.pop(vizinho, None)
+        self.conhecidas.pop(vizinho, None)
+
+    def descartar_origem(self, origem: str, vizinhos: Optional[Iterable[str]] = None) -> None:
+        """
+        Remove das listas a LSA de uma origem que saiu da LSDB.
+
+        Args:
+            origem: Roteador de origem da LSA
+            vizinhos: Vizinhos cujas listas são limpas (todos, se omitido); usado quando
+                a LSA saiu da LSDB de uma só área
+        """
+        for vizinho in self.retransmissao if vizinhos is None else vizinhos:
+            self.retransmissao.get(vizinho, {}).pop(origem, None)
+        for vizinho in self.conhecidas if vizinhos is None else vizinhos:
+            self.conhecidas.get(vizinho, {}).pop(origem, None)
+
+    def vencidas(self, agora: float) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Retorna as LSAs cujo prazo de confirmação expirou e reagenda o próximo reenvio.
+
+        Args:
+            agora: Instante atual (time.monotonic)
+
+        Returns:
+            Dicionário {vizinho: [LSAs a reenviar]}
+        """
+        reenvios = {}
+        for vizinho, pendentes in self.retransmissao.items():
+            lsas = [lsa for lsa, prazo in pendentes.values() if prazo <= agora]
+            if lsas:
+                for lsa in lsas:
+                    pendentes[lsa["id"]] = (lsa, agora + self.intervalo_retransmissao)
+                reenvios[vizinho] = lsas
+        return reenvios
+
+    def agendar_ack(self, endereco: str, chaves: List[Tuple[str, int]]) -> None:
+        """
+        Acumula confirmações a enviar para um endereço.
+
+        Args:
+            endereco: IP de origem do datagrama confirmado
+            chaves: Lista de (origem, sequência) recebidas
+        """
+        self.acks.setdefault(endereco, []).extend(chaves)
+
+    def retirar_acks(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Retorna e esvazia as confirmações acumuladas.
+
+        Returns:
+            Dicionário {endereço: [(origem, sequência)]}
+        """
+        acks, self.acks = self.acks, {}
+        return acks
+
+    def pendentes(self) -> int:
+        """Retorna a quantidade total de LSAs aguardando confirmação."""
+        return sum(len(pendentes) for pendentes in self.retransmissao.values())
@@ -0,0 +1,146 @@
+"""
+Métricas do Roteador
+--------------------
+Este módulo expõe contadores, medidores e histogramas do roteador no formato
+de texto do Prometheus, por um servidor HTTP mínimo no próprio laço de
+eventos (qualquer GET responde com as métricas). Os valores que o roteador já
+mantém (contadores de LSAs, execuções do SPF, chamadas de envio, ...) são
+lidos por coletores no momento da consulta, sem custo no caminho crítico;
+apenas as durações observadas passam por histogramas.
+"""
+
+import asyncio
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Limites (s) dos histogramas de duração: de 100 µs a 2,5 s
+LIMITES_DURACAO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Tamanho máximo aceito para a requisição HTTP (linha de pedido e cabeçalhos)
+TAMANHO_MAXIMO_REQUISICAO = 8192
+# Tempo máximo (s) para receber a requisição e enviar a resposta; clientes mais lentos são desconectados
+TEMPO_MAXIMO_REQUISICAO = 5.0
+
+# Amostra de um coletor: (nome, tipo "counter"/"gauge", ajuda, rótulos, valor)
+Amostra = Tuple[str, str, str, Dict[str, str], float]
+
+
+class Histograma:
+    """Histograma cumulativo de durações, no modelo do Prometheus."""
+
+    def __init__(self, limites: Sequence[float] = LIMITES_DURACAO):
+        """
+        Args:
+            limites: Limites superiores (crescentes) das faixas
+        """
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)  # A última faixa é +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        """
+        Registra uma observação.
+
+        Args:
+            valor: Valor observado (ex: duração em segundos)
+        """
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas(self, nome: str) -> List[str]:
+        """Retorna as linhas _bucket, _sum e _count do histograma."""
+        linhas = []
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float('inf'),), self.contagens):
+            acumulado += contagem
+            rotulo = "+Inf" if limite == float('inf') else repr(limite)
+            linhas.append(f'{nome}_bucket{{le="{rotulo}"}} {acumulado}')
+        linhas.append(f"{nome}_sum {self.soma!r}")
+        linhas.append(f"{nome}_count {self.total}")
+        return linhas
+
+
+def _rotulos(rotulos: Dict[str, str]) -> str:
+    """Formata os rótulos de uma amostra ({chave="valor",...})."""
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{chave}="{valor}"' for chave, valor in sorted(rotulos.items())) + "}"
+
+
+class Metricas:
+    """Classe que reúne as métricas do roteador e as serve via HTTP."""
+
+    def __init__(self, prefixo: str = "roteador"):
+        """
+        Args:
+            prefixo: Prefixo adicionado ao nome de todas as métricas
+        """
+        self.prefixo = prefixo
+        self.coletores: List[Callable[[], Iterable[Amostra]]] = []
+        self.histogramas: Dict[str, Tuple[str, Histograma]] = {}
+        self.servidor: Optional[asyncio.AbstractServer] = None
+
+    def registrar(self, coletor: Callable[[], Iterable[Amostra]]) -> None:
+        """
+        Registra uma função chamada a cada consulta para ler contadores e medidores.
+
+        Args:
+            coletor: Função que retorna amostras (nome, tipo, ajuda, rótulos, valor)
+        """
+        self.coletores.append(coletor)
+
+    def histograma(self, nome: str, ajuda: str, limites: Sequence[float] = LIMITES_DURACAO) -> Histograma:
+        """
+        Cria (ou retorna, se já existir) um histograma.
+
+        Args:
+            nome: Nome da métrica, sem o prefixo
+            ajuda: Descrição exibida no HELP
+            limites: Limites superiores das faixas
+
+        Returns:
+            Histograma em que as observações devem ser registradas
+        """
+        if nome not in self.histogramas:
+            self.histogramas[nome] = (ajuda, Histograma(limites))
+        return self.histogramas[nome][1]
+
+    def exportar(self) -> str:
+        """Retorna todas as métricas no formato de texto do Prometheus."""
+        familias: Dict[str, Tuple[str, str, List[str]]] = {}
+        for coletor in self.coletores:
+            for nome, tipo, ajuda, rotulos, valor in coletor():
+                nome = f"{self.prefixo}_{nome}"
+                familias.setdefault(nome, (tipo, ajuda, []))[2].append(f"{nome}{_rotulos(rotulos)} {valor}")
+
+        linhas = []
+        for nome, (tipo, ajuda, amostras) in familias.items():
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"] + amostras
+        for nome, (ajuda, histograma) in self.histogramas.items():
+            nome = f"{self.prefixo}_{nome}"
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} histogram"] + histograma.linhas(nome)
+        return "\n".join(linhas) + "\n"
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Responde a uma requisição HTTP com as métricas."""
+        try:
+            await asyncio.wait_for(leitor.readuntil(b"\r\n\r\n"), TEMPO_MAXIMO_REQUISICAO)
+            corpo = self.exportar().encode()
+            escritor.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                           + f"Content-Length: {len(corpo)}\r\nConnection: close\r\n\r\n".encode() + corpo)
+            await asyncio.wait_for(escritor.drain(), TEMPO_MAXIMO_REQUISICAO)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, porta: int, endereco: str = "127.0.0.1") -> None:
+        """
+        Inicia o servidor HTTP de métricas.
+
+        Args:
+            porta: Porta TCP
+            endereco: Endereço local em que o servidor escuta
+        """
+        self.servidor = await asyncio.start_server(self._atender, endereco, porta, limit=TAMANHO_MAXIMO_REQUISICAO)
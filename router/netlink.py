@@ -0,0 +1,335 @@
+"""
+Programação de Rotas via rtnetlink
+----------------------------------
+Este módulo conversa diretamente com o kernel através de um socket
+AF_NETLINK (NETLINK_ROUTE), evitando criar um processo `ip` para cada rota.
+A tabela principal é lida com um único dump e as alterações (add, replace e
+del) são enviadas em lote, várias mensagens por datagrama, com confirmação
+individual de cada uma. Rotas com mais de um próximo salto de mesmo custo
+(ECMP) são programadas como rotas multipath (RTA_MULTIPATH). Os prefixos
+conectados anunciados nas LSAs são lidos com um dump dos endereços IPv4.
+
+Pode ser exercitado sem nenhum serviço externo dentro de um namespace de rede:
+
+    unshare -rn python3 netlink.py
+"""
+
+import ipaddress
+import os
+import select
+import socket
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+from dycastra import ordenar_saltos
+
+NETLINK_ROUTE = 0
+
+# Tipos de mensagem
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_GETROUTE = 26
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+
+# Flags do cabeçalho netlink
+NLM_F_REQUEST = 0x01
+NLM_F_ACK = 0x04
+NLM_F_ROOT = 0x100
+NLM_F_MATCH = 0x200
+NLM_F_DUMP = NLM_F_ROOT | NLM_F_MATCH
+NLM_F_REPLACE = 0x100
+NLM_F_EXCL = 0x200
+NLM_F_CREATE = 0x400
+
+# Grupo multicast de notificações de rotas IPv4
+RTMGRP_IPV4_ROUTE = 0x40
+
+# Campos de rtmsg
+RT_TABLE_MAIN = 254
+RTPROT_BOOT = 3
+RT_SCOPE_UNIVERSE = 0
+RT_SCOPE_HOST = 254
+RT_SCOPE_NOWHERE = 255
+RTN_UNICAST = 1
+
+# Atributos de rota
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_MULTIPATH = 9
+RTA_TABLE = 15
+
+# Atributos de endereço
+IFA_ADDRESS = 1
+
+NLMSGHDR = struct.Struct("=IHHII")
+NLMSGERR = struct.Struct("=i")
+RTMSG = struct.Struct("=BBBBBBBBI")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR = struct.Struct("=HH")
+RTNEXTHOP = struct.Struct("=HBBi")
+
+# Quantidade máxima de mensagens enviadas em um único datagrama
+TAMANHO_LOTE = 256
+
+
+def _alinhar(tamanho: int) -> int:
+    """Arredonda o tamanho para o alinhamento de 4 bytes do netlink."""
+    return (tamanho + 3) & ~3
+
+
+def _atributo(tipo: int, dados: bytes) -> bytes:
+    """Codifica um atributo rtattr com o preenchimento necessário."""
+    tamanho = RTATTR.size + len(dados)
+    return RTATTR.pack(tamanho, tipo) + dados + b"\0" * (_alinhar(tamanho) - tamanho)
+
+
+def _atributos(dados: bytes, inicio: int, fim: int) -> Dict[int, bytes]:
+    """Decodifica a sequência de atributos rtattr entre inicio e fim."""
+    attrs = {}
+    while inicio + RTATTR.size <= fim:
+        tamanho, tipo = RTATTR.unpack_from(dados, inicio)
+        if tamanho < RTATTR.size:
+            break
+        attrs[tipo] = dados[inicio + RTATTR.size:inicio + tamanho]
+        inicio += _alinhar(tamanho)
+    return attrs
+
+
+def _saltos_multipath(dados: bytes) -> List[str]:
+    """Extrai os gateways de um atributo RTA_MULTIPATH (sequência de rtnexthop)."""
+    saltos = []
+    pos = 0
+    while pos + RTNEXTHOP.size <= len(dados):
+        tamanho = RTNEXTHOP.unpack_from(dados, pos)[0]
+        if tamanho < RTNEXTHOP.size:
+            break
+        attrs = _atributos(dados, pos + RTNEXTHOP.size, pos + tamanho)
+        if RTA_GATEWAY in attrs:
+            saltos.append(socket.inet_ntoa(attrs[RTA_GATEWAY]))
+        pos += _alinhar(tamanho)
+    return saltos
+
+
+class ErroNetlink(OSError):
+    """Erro retornado pelo kernel para uma requisição netlink."""
+
+
+class RtNetlink:
+    """Classe para leitura e programação da tabela de rotas IPv4 via rtnetlink."""
+
+    def __init__(self):
+        """
+        Abre o socket netlink.
+
+        Raises:
+            OSError: Se a plataforma não suportar AF_NETLINK
+        """
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.bind((0, 0))
+        self.pid = self.sock.getsockname()[0]
+        self.seq = 0
+        self.monitor: Optional[socket.socket] = None
+
+    def fechar(self) -> None:
+        """Fecha o socket netlink."""
+        self.sock.close()
+        if self.monitor is not None:
+            self.monitor.close()
+
+    def aguardar_alteracao_externa(self, timeout: float) -> bool:
+        """
+        Aguarda notificações de rotas IPv4 feitas por outros processos ou pelo kernel.
+
+        As notificações causadas pelas requisições deste socket são ignoradas.
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            True se alguma rota foi alterada externamente, False se o tempo esgotou
+        """
+        if self.monitor is None:
+            self.monitor = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            self.monitor.bind((0, RTMGRP_IPV4_ROUTE))
+
+        limite = time.monotonic() + timeout
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return False
+            prontos, _, _ = select.select([self.monitor], [], [], restante)
+            if not prontos:
+                return False
+            try:
+                dados = self.monitor.recv(65536)
+            except OSError:
+                # ENOBUFS: notificações perdidas, a tabela precisa ser relida
+                return True
+            for tipo, _, _, pid, _, _ in self._mensagens(dados):
+                if tipo in (RTM_NEWROUTE, RTM_DELROUTE) and pid != self.pid:
+                    return True
+
+    def _proximo_seq(self) -> int:
+        """Retorna um novo número de sequência para uma requisição."""
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return self.seq
+
+    def _mensagens(self, dados: bytes):
+        """Itera sobre as mensagens (tipo, flags, seq, pid, inicio, fim) contidas em um datagrama."""
+        pos = 0
+        while pos + NLMSGHDR.size <= len(dados):
+            tamanho, tipo, flags, seq, pid = NLMSGHDR.unpack_from(dados, pos)
+            if tamanho < NLMSGHDR.size:
+                break
+            yield tipo, flags, seq, pid, pos + NLMSGHDR.size, pos + tamanho
+            pos += _alinhar(tamanho)
+
+    def _dump(self, tipo_requisicao: int, corpo: bytes):
+        """Envia uma requisição de dump e itera sobre as respostas (tipo, dados, inicio, fim)."""
+        seq = self._proximo_seq()
+        cabecalho = NLMSGHDR.pack(NLMSGHDR.size + len(corpo), tipo_requisicao, NLM_F_REQUEST | NLM_F_DUMP, seq, 0)
+        self.sock.send(cabecalho + corpo)
+
+        while True:
+            dados = self.sock.recv(65536)
+            for tipo, _, msg_seq, _, inicio, fim in self._mensagens(dados):
+                if msg_seq != seq:
+                    continue
+                if tipo == NLMSG_DONE:
+                    return
+                if tipo == NLMSG_ERROR:
+                    erro = -NLMSGERR.unpack_from(dados, inicio)[0]
+                    raise ErroNetlink(erro, os.strerror(erro))
+                yield tipo, dados, inicio, fim
+
+    def listar_prefixos(self) -> List[str]:
+        """
+        Lê os prefixos IPv4 conectados às interfaces (exceto os de escopo host, como o loopback).
+
+        Returns:
+            List[str]: Redes conectadas (ex: 172.20.1.0/24), sem repetição
+        """
+        prefixos = []
+        for tipo, dados, inicio, fim in self._dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)):
+            if tipo != RTM_NEWADDR:
+                continue
+            familia, prefixo, _, escopo, _ = IFADDRMSG.unpack_from(dados, inicio)
+            attrs = _atributos(dados, inicio + IFADDRMSG.size, fim)
+            if familia != socket.AF_INET or escopo == RT_SCOPE_HOST or IFA_ADDRESS not in attrs:
+                continue
+            rede = str(ipaddress.IPv4Network(f"{socket.inet_ntoa(attrs[IFA_ADDRESS])}/{prefixo}", strict=False))
+            if rede not in prefixos:
+                prefixos.append(rede)
+        return prefixos
+
+    def listar_rotas(self) -> Tuple[Dict[str, Tuple[str, ...]], Dict[str, int]]:
+        """
+        Lê a tabela principal IPv4 com um único dump.
+
+        Returns:
+            Tuple[Dict[str, Tuple[str, ...]], Dict[str, int]]:
+                - Rotas com gateway (rede -> próximos saltos ordenados)
+                - Rotas diretamente conectadas (rede -> índice da interface)
+        """
+        rotas_via = {}
+        rotas_conectadas = {}
+        for tipo, dados, inicio, fim in self._dump(RTM_GETROUTE, RTMSG.pack(socket.AF_INET, 0, 0, 0, 0, 0, 0, 0, 0)):
+            if tipo != RTM_NEWROUTE:
+                continue
+
+            familia, dst_len, _, _, tabela, _, _, tipo_rota, _ = RTMSG.unpack_from(dados, inicio)
+            attrs = _atributos(dados, inicio + RTMSG.size, fim)
+            if RTA_TABLE in attrs:
+                tabela = struct.unpack("=I", attrs[RTA_TABLE])[0]
+            if familia != socket.AF_INET or tabela != RT_TABLE_MAIN or tipo_rota != RTN_UNICAST or dst_len == 0:
+                continue
+
+            rede = f"{socket.inet_ntoa(attrs.get(RTA_DST, bytes(4)))}/{dst_len}"
+            if RTA_GATEWAY in attrs:
+                rotas_via[rede] = (socket.inet_ntoa(attrs[RTA_GATEWAY]),)
+            elif RTA_MULTIPATH in attrs:
+                rotas_via[rede] = ordenar_saltos(_saltos_multipath(attrs[RTA_MULTIPATH]))
+            elif RTA_OIF in attrs:
+                rotas_conectadas[rede] = struct.unpack("=I", attrs[RTA_OIF])[0]
+        return rotas_via, rotas_conectadas
+
+    def _mensagem_rota(self, tipo: int, flags: int, destino: str, proximos_saltos: Optional[Tuple[str, ...]]) -> Tuple[int, bytes]:
+        """Monta uma mensagem RTM_NEWROUTE/RTM_DELROUTE para o destino informado."""
+        rede = ipaddress.IPv4Network(destino, strict=False)
+        if tipo == RTM_DELROUTE:
+            corpo = RTMSG.pack(socket.AF_INET, rede.prefixlen, 0, 0, RT_TABLE_MAIN, 0, RT_SCOPE_NOWHERE, 0, 0)
+        else:
+            corpo = RTMSG.pack(socket.AF_INET, rede.prefixlen, 0, 0, RT_TABLE_MAIN, RTPROT_BOOT, RT_SCOPE_UNIVERSE, RTN_UNICAST, 0)
+        corpo += _atributo(RTA_DST, rede.network_address.packed)
+        if proximos_saltos is not None and len(proximos_saltos) == 1:
+            corpo += _atributo(RTA_GATEWAY, socket.inet_aton(proximos_saltos[0]))
+        elif proximos_saltos:
+            saltos = b""
+            for salto in proximos_saltos:
+                gateway = _atributo(RTA_GATEWAY, socket.inet_aton(salto))
+                saltos += RTNEXTHOP.pack(RTNEXTHOP.size + len(gateway), 0, 0, 0) + gateway
+            corpo += _atributo(RTA_MULTIPATH, saltos)
+
+        seq = self._proximo_seq()
+        cabecalho = NLMSGHDR.pack(NLMSGHDR.size + len(corpo), tipo, NLM_F_REQUEST | NLM_F_ACK | flags, seq, 0)
+        return seq, cabecalho + corpo
+
+    def aplicar(self, adicionar: Dict[str, Tuple[str, ...]], remover: Dict[str, Tuple[str, ...]],
+                substituir: Dict[str, Tuple[str, ...]]) -> List[Tuple[str, str, Optional[Tuple[str, ...]], int]]:
+        """
+        Aplica um conjunto de alterações na tabela principal em lote.
+
+        Args:
+            adicionar: Rotas a adicionar (rede -> próximos saltos)
+            remover: Rotas a remover (rede -> próximos saltos atuais)
+            substituir: Rotas a substituir (rede -> novos próximos saltos)
+
+        Returns:
+            Lista de (operação, rede, próximos saltos, errno) na ordem de envio;
+            errno 0 indica sucesso
+        """
+        operacoes = []
+        for destino in remover:
+            operacoes.append(("del", destino, None, RTM_DELROUTE, 0))
+        for destino, proximo_salto in adicionar.items():
+            operacoes.append(("add", destino, proximo_salto, RTM_NEWROUTE, NLM_F_CREATE | NLM_F_EXCL))
+        for destino, proximo_salto in substituir.items():
+            operacoes.append(("replace", destino, proximo_salto, RTM_NEWROUTE, NLM_F_CREATE | NLM_F_REPLACE))
+
+        resultados = []
+        for i in range(0, len(operacoes), TAMANHO_LOTE):
+            lote = operacoes[i:i + TAMANHO_LOTE]
+            pendentes = {}
+            mensagens = []
+            for operacao, destino, proximo_salto, tipo, flags in lote:
+                seq, mensagem = self._mensagem_rota(tipo, flags, destino, proximo_salto)
+                pendentes[seq] = None
+                mensagens.append(mensagem)
+            self.sock.send(b"".join(mensagens))
+
+            # Cada mensagem recebe um NLMSG_ERROR próprio (erro 0 = confirmação)
+            faltando = len(pendentes)
+            while faltando:
+                dados = self.sock.recv(65536)
+                for tipo, _, seq, _, inicio, _ in self._mensagens(dados):
+                    if tipo == NLMSG_ERROR and seq in pendentes and pendentes[seq] is None:
+                        pendentes[seq] = -NLMSGERR.unpack_from(dados, inicio)[0]
+                        faltando -= 1
+
+            for (operacao, destino, proximo_salto, _, _), erro in zip(lote, pendentes.values()):
+                resultados.append((operacao, destino, proximo_salto, erro))
+        return resultados
+
+
+if __name__ == "__main__":
+    nl = RtNetlink()
+    print(f"prefixos conectados: {', '.join(nl.listar_prefixos())}")
+    rotas_via, rotas_conectadas = nl.listar_rotas()
+    for rede, interface in rotas_conectadas.items():
+        print(f"{rede} dev {socket.if_indextoname(interface)}")
+    for rede, proximos_saltos in rotas_via.items():
+        print(f"{rede} via {', '.join(proximos_saltos)}")
@@ -0,0 +1,101 @@
+"""
+Barreira de Início
+------------------
+Este módulo bloqueia o roteador até o sinal de início sem consumir CPU.
+O arquivo de início é observado com inotify (via ctypes) no diretório que o
+contém, de modo que a escrita de "start" acorda o processo imediatamente; o
+sinal SIGUSR1 também libera a barreira e, depois dela, passa a ser ignorado,
+para que o mesmo sinal enviado a todos os containers não encerre os
+roteadores que já estão em execução. Quando o inotify não está disponível
+(ou não entrega eventos, como em alguns volumes montados), o arquivo é
+relido a cada intervalo, dormindo entre as leituras.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+from typing import Optional
+
+# Eventos do inotify que podem indicar uma nova escrita no arquivo de início
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+EVENTOS_INICIO = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# Tamanho do buffer de leitura dos eventos (comporta vários eventos com nome)
+TAMANHO_EVENTOS = 4096
+
+
+def _liberado(caminho: str, conteudo: str) -> bool:
+    """Indica se o arquivo de início contém o sinal esperado."""
+    try:
+        with open(caminho, "r") as file:
+            return file.read().strip() == conteudo
+    except OSError:
+        return False
+
+
+def _abrir_inotify(diretorio: str) -> Optional[int]:
+    """
+    Cria uma instância do inotify observando o diretório do arquivo de início.
+
+    Args:
+        diretorio: Diretório que contém o arquivo
+
+    Returns:
+        Descritor do inotify, ou None se indisponível
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError, TypeError):
+        return None
+    inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+    fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    if inotify_add_watch(fd, os.fsencode(diretorio), EVENTOS_INICIO) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def aguardar_inicio(caminho: str = "start.txt", conteudo: str = "start", intervalo: float = 1.0) -> None:
+    """
+    Bloqueia até que o arquivo de início contenha o sinal ou até chegar um SIGUSR1.
+
+    Args:
+        caminho: Arquivo de início
+        conteudo: Conteúdo que libera a barreira
+        intervalo: Tempo máximo (s) entre duas leituras do arquivo
+    """
+    sinalizado = False
+
+    def liberar(signum, frame) -> None:
+        nonlocal sinalizado
+        sinalizado = True
+
+    leitura, escrita = os.pipe()
+    os.set_blocking(escrita, False)
+    signal.signal(signal.SIGUSR1, liberar)
+    despertador = signal.set_wakeup_fd(escrita)
+    fd = _abrir_inotify(os.path.dirname(os.path.abspath(caminho)))
+    try:
+        descritores = [leitura] if fd is None else [leitura, fd]
+        while not sinalizado and not _liberado(caminho, conteudo):
+            prontos, _, _ = select.select(descritores, [], [], intervalo)
+            for pronto in prontos:
+                try:
+                    os.read(pronto, TAMANHO_EVENTOS)
+                except BlockingIOError:
+                    pass
+    finally:
+        signal.set_wakeup_fd(despertador)
+        # Um SIGUSR1 tardio (ex: após reiniciar um container) não deve encerrar o roteador
+        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        for descritor in (leitura, escrita) if fd is None else (leitura, escrita, fd):
+            os.close(descritor)
@@ -0,0 +1,126 @@
+"""
+Rotas por Prefixo
+-----------------
+Este módulo converte os próximos saltos por roteador calculados pelo SPF em
+rotas por prefixo IPv4. Cada roteador anuncia as redes conectadas às suas
+interfaces; cada prefixo herda os próximos saltos do anunciante mais
+próximo (a união deles quando há empate), de modo que redes de qualquer
+tamanho são roteadas sem supor um /24 por roteador. A busca pelo maior
+prefixo fica a cargo do kernel: aqui os prefixos são apenas chaves, na
+forma canônica. Os sumários anunciados
+por roteadores de borda de área entram como prefixos com custo adicional.
+"""
+
+import functools
+import ipaddress
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from dycastra import ordenar_saltos
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalizar(prefixo: str) -> str:
+    """Retorna o prefixo na forma canônica (ex: 172.20.1.7/24 -> 172.20.1.0/24)."""
+    return str(ipaddress.IPv4Network(prefixo, strict=False))
+
+
+class RotasPrefixos:
+    """Classe que converte os próximos saltos por roteador do SPF em rotas por prefixo."""
+
+    def __init__(self, origem: str, usar_sumarios: bool = True):
+        """
+        Args:
+            origem: IP (identificador) do roteador local; seus prefixos são conectados e não geram rotas
+            usar_sumarios: Se os sumários de outras áreas anunciados pelos roteadores de borda são considerados
+        """
+        self.origem = origem
+        self.usar_sumarios = usar_sumarios
+        # prefixo -> roteador que o anuncia -> (entre áreas, custo a partir do roteador)
+        self.anunciantes: Dict[str, Dict[str, Tuple[bool, float]]] = {}
+        self.prefixos_roteador: Dict[str, Dict[str, Tuple[bool, float]]] = {}  # roteador -> prefixos anunciados
+        self.rotas: Dict[str, Tuple[str, ...]] = {}  # prefixo -> próximos saltos
+        self.melhores: Dict[str, Tuple[str, ...]] = {}  # prefixo -> anunciantes mais próximos
+        self.custos: Dict[str, Tuple[bool, float]] = {}  # prefixo -> (rota entre áreas, custo total)
+        # Prefixos reavaliados na última atualização (rota ou custo podem ter mudado)
+        self.revisados: Set[str] = set()
+
+    def _anunciados(self, lsa: Optional[Dict[str, Any]]) -> Dict[str, Tuple[bool, float]]:
+        """Retorna os prefixos de uma LSA: conectados (custo 0) e, se usados, os sumários de outros roteadores."""
+        if not lsa:
+            return {}
+        anunciados = {}
+        if self.usar_sumarios and lsa["id"] != self.origem:
+            for prefixo, custo in lsa.get("sumarios", {}).items():
+                anunciados[_normalizar(prefixo)] = (True, custo)
+        for prefixo in lsa.get("prefixos", ()):
+            anunciados[_normalizar(prefixo)] = (False, 0)
+        return anunciados
+
+    def atualizar(self, roteadores: Iterable[str], lsdb: Dict[str, Any], spf: Any) -> Dict[str, Optional[Tuple[str, ...]]]:
+        """
+        Reavalia os prefixos anunciados pelos roteadores cuja LSA ou caminho mudou.
+
+        Rotas dentro da área têm preferência sobre sumários de outras áreas;
+        entre rotas do mesmo tipo vence o menor custo total.
+
+        Args:
+            roteadores: Roteadores cuja LSA mudou ou cuja distância/próximos saltos podem ter mudado
+            lsdb: Base de dados de estado de enlace
+            spf: SPFIncremental já atualizado (fornece `tabela` e `distancia`)
+
+        Returns:
+            Prefixos cuja rota mudou (prefixo -> próximos saltos, None se removido)
+        """
+        afetados = set()
+        for roteador in roteadores:
+            novos = self._anunciados(lsdb.get(roteador))
+            antigos = self.prefixos_roteador.get(roteador, {})
+            for prefixo in antigos.keys() - novos.keys():
+                del self.anunciantes[prefixo][roteador]
+                if not self.anunciantes[prefixo]:
+                    del self.anunciantes[prefixo]
+            for prefixo, anuncio in novos.items():
+                self.anunciantes.setdefault(prefixo, {})[roteador] = anuncio
+            if novos:
+                self.prefixos_roteador[roteador] = novos
+            else:
+                self.prefixos_roteador.pop(roteador, None)
+            afetados.update(antigos)
+            afetados.update(novos)
+        self.revisados = afetados
+
+        alteracoes: Dict[str, Optional[Tuple[str, ...]]] = {}
+        for prefixo in afetados:
+            melhor = (True, float('inf'))
+            saltos: Set[str] = set()
+            melhores: List[str] = []
+            anunciantes = self.anunciantes.get(prefixo, {})
+            if self.origem not in anunciantes:
+                for roteador, (entre_areas, custo) in anunciantes.items():
+                    caminho = spf.tabela.get(roteador)
+                    if caminho is None:
+                        continue
+                    chave = (entre_areas, spf.distancia(roteador) + custo)
+                    if chave < melhor:
+                        melhor, saltos, melhores = chave, set(caminho), [roteador]
+                    elif chave == melhor:
+                        saltos.update(caminho)
+                        melhores.append(roteador)
+
+            novo = ordenar_saltos(saltos) if saltos else None
+            if novo is None:
+                self.melhores.pop(prefixo, None)
+                self.custos.pop(prefixo, None)
+            else:
+                self.melhores[prefixo] = tuple(melhores)
+                self.custos[prefixo] = melhor
+            if self.rotas.get(prefixo) != novo:
+                if novo is None:
+                    del self.rotas[prefixo]
+                else:
+                    self.rotas[prefixo] = novo
+                alteracoes[prefixo] = novo
+        return alteracoes
+
+    def tabela(self) -> Dict[str, Tuple[str, ...]]:
+        """Retorna a tabela completa (prefixo -> próximos saltos)."""
+        return dict(self.rotas)
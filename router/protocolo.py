@@ -0,0 +1,381 @@
+"""
+Formato Binário das Mensagens entre Roteadores
+----------------------------------------------
+Este módulo define a codificação binária, versionada, dos pacotes trocados
+entre os roteadores. Todo datagrama começa com um cabeçalho fixo (mágico,
+versão, tipo e a área do enlace pelo qual é enviado); uma atualização de estado de enlace (LSU) carrega uma ou mais
+LSAs, cada uma com origem IPv4 em u32, sequência u64, idade, checksum, um
+vetor de largura fixa de entradas (IPv4 do vizinho, custo), um vetor com os
+prefixos conectados do roteador (rede IPv4, tamanho) e, nas LSAs de roteadores
+de borda de área, um vetor de sumários de rotas de outras áreas (rede IPv4,
+tamanho, custo). Os pacotes HELLO
+e suas respostas carregam o remetente, uma sequência e o instante de envio.
+As confirmações (LS-Ack), as descrições da LSDB (DBD) trocadas quando uma
+adjacência sobe e os pedidos de LSAs (LSR) carregam apenas listas de
+(origem, sequência).
+
+A decodificação trabalha sobre um memoryview do datagrama, sem copiar os bytes.
+O primeiro byte distingue o formato binário do JSON legado ('{'), permitindo
+que ambos convivam durante a transição.
+"""
+
+import re
+import socket
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+MAGICO = 0xA5
+# Versão 2: as LSAs passaram a carregar os prefixos conectados
+# Versão 3: área no cabeçalho e sumários entre áreas nas LSAs
+VERSAO = 3
+
+# Tipos de pacote
+TIPO_LSU = 1
+TIPO_HELLO = 2
+TIPO_HELLO_RESPOSTA = 3
+TIPO_LSACK = 4
+TIPO_DBD = 5
+TIPO_LSR = 6
+
+# Maior carga útil de um datagrama UDP sobre IPv4
+TAMANHO_MAXIMO_UDP = 65507
+# Quantidade máxima de (origem, sequência) em um pacote LS-Ack, DBD ou LSR
+RESUMOS_POR_PACOTE = 4096
+
+# mágico, versão, tipo, área
+CABECALHO = struct.Struct("!BBBB")
+# quantidade de LSAs no pacote
+CONTAGEM = struct.Struct("!H")
+# origem, sequência, idade, quantidade de vizinhos, de prefixos e de sumários, checksum
+LSA = struct.Struct("!IQHHHHI")
+# IPv4 do vizinho, custo
+VIZINHO = struct.Struct("!Id")
+# rede IPv4, tamanho do prefixo
+PREFIXO = struct.Struct("!IB")
+# rede IPv4, tamanho do prefixo, custo a partir do roteador de borda que anuncia o sumário
+SUMARIO = struct.Struct("!IBd")
+# roteador remetente, sequência do hello, carimbo de tempo do remetente (ecoado na resposta)
+HELLO = struct.Struct("!IId")
+# origem, sequência e quantidades de vizinhos, prefixos e sumários lidas diretamente do registro da LSA
+CHAVE_LSA = struct.Struct("!4sQ2xHHH")
+# origem e sequência de uma LSA (confirmações, descrições da LSDB e pedidos)
+RESUMO = struct.Struct("!IQ")
+
+# Origem e sequência de um LSA JSON gerado por json.dumps (chaves "id" no início e "seq" no fim)
+CHAVE_JSON = re.compile(rb'\A\{"id": "([0-9.]+)".*"seq": (\d+)\}\Z', re.DOTALL)
+
+
+class ErroPacote(ValueError):
+    """Pacote malformado, truncado ou com checksum inválido."""
+
+
+def eh_binario(dados: bytes) -> bool:
+    """
+    Indica se o datagrama está no formato binário.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        True para o formato binário, False para o JSON legado
+    """
+    return len(dados) > 0 and dados[0] == MAGICO
+
+
+def tipo_pacote(dados: bytes) -> Optional[int]:
+    """
+    Retorna o tipo de um datagrama binário.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        Tipo do pacote, ou None se não for um pacote binário desta versão
+    """
+    if len(dados) < CABECALHO.size or dados[0] != MAGICO or dados[1] != VERSAO:
+        return None
+    return dados[2]
+
+
+def area_pacote(dados: bytes) -> int:
+    """
+    Retorna a área informada no cabeçalho de um datagrama binário.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        Área do enlace pelo qual o datagrama foi enviado
+    """
+    return dados[3]
+
+
+def _checksum(registro: memoryview) -> int:
+    """Calcula o checksum de uma LSA, excluindo os campos de idade e checksum."""
+    crc = zlib.crc32(registro[0:12])
+    crc = zlib.crc32(registro[14:20], crc)
+    return zlib.crc32(registro[LSA.size:], crc)
+
+
+def codificar_lsa(lsa: Dict[str, Any]) -> bytes:
+    """
+    Codifica uma LSA no formato binário.
+
+    Args:
+        lsa: LSA no formato de dicionário usado pela LSDB
+
+    Returns:
+        Registro binário da LSA
+    """
+    vizinhos = list(lsa["vizinhos"].values())
+    prefixos = lsa.get("prefixos", [])
+    sumarios = lsa.get("sumarios", {})
+    registro = bytearray(LSA.size + VIZINHO.size * len(vizinhos) + PREFIXO.size * len(prefixos)
+                         + SUMARIO.size * len(sumarios))
+    LSA.pack_into(registro, 0, struct.unpack("!I", socket.inet_aton(lsa["id"]))[0],
+                  lsa["seq"], lsa.get("idade", 0), len(vizinhos), len(prefixos), len(sumarios), 0)
+    pos = LSA.size
+    for ip, custo in vizinhos:
+        VIZINHO.pack_into(registro, pos, struct.unpack("!I", socket.inet_aton(ip))[0], custo)
+        pos += VIZINHO.size
+    for prefixo in prefixos:
+        rede, tamanho = prefixo.split("/")
+        PREFIXO.pack_into(registro, pos, struct.unpack("!I", socket.inet_aton(rede))[0], int(tamanho))
+        pos += PREFIXO.size
+    for prefixo, custo in sumarios.items():
+        rede, tamanho = prefixo.split("/")
+        SUMARIO.pack_into(registro, pos, struct.unpack("!I", socket.inet_aton(rede))[0], int(tamanho), custo)
+        pos += SUMARIO.size
+    struct.pack_into("!I", registro, 20, _checksum(memoryview(registro)))
+    return bytes(registro)
+
+
+def _montar_lsu(registros: List[bytes], area: int = 0) -> bytes:
+    """Monta um pacote LSU a partir de registros de LSA já codificados."""
+    return b"".join([CABECALHO.pack(MAGICO, VERSAO, TIPO_LSU, area), CONTAGEM.pack(len(registros))] + registros)
+
+
+def codificar_lsu(lsas: List[Dict[str, Any]], area: int = 0) -> bytes:
+    """
+    Monta um pacote de atualização (LSU) com as LSAs informadas.
+
+    Args:
+        lsas: LSAs a transportar
+        area: Área à qual as LSAs pertencem
+
+    Returns:
+        Datagrama pronto para envio
+    """
+    return _montar_lsu([codificar_lsa(lsa) for lsa in lsas], area)
+
+
+def codificar_lsus(lsas: List[Dict[str, Any]], tamanho_maximo: int = TAMANHO_MAXIMO_UDP, area: int = 0) -> List[bytes]:
+    """
+    Agrupa as LSAs no menor número de pacotes LSU que respeitem o tamanho máximo.
+
+    Args:
+        lsas: LSAs a transportar
+        tamanho_maximo: Tamanho máximo (bytes) de cada datagrama
+        area: Área à qual as LSAs pertencem
+
+    Returns:
+        Datagramas prontos para envio
+    """
+    pacotes = []
+    registros: List[bytes] = []
+    tamanho = CABECALHO.size + CONTAGEM.size
+    for lsa in lsas:
+        registro = codificar_lsa(lsa)
+        if registros and (tamanho + len(registro) > tamanho_maximo or len(registros) == 0xFFFF):
+            pacotes.append(_montar_lsu(registros, area))
+            registros = []
+            tamanho = CABECALHO.size + CONTAGEM.size
+        registros.append(registro)
+        tamanho += len(registro)
+    if registros:
+        pacotes.append(_montar_lsu(registros, area))
+    return pacotes
+
+
+def decodificar_lsu(dados: bytes) -> List[Dict[str, Any]]:
+    """
+    Decodifica um pacote de atualização (LSU) sem copiar o datagrama.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        Lista de LSAs no formato de dicionário usado pela LSDB; os vizinhos
+        são indexados pelo próprio IP, já que o formato binário não carrega nomes
+
+    Raises:
+        ErroPacote: Se o pacote for inválido
+    """
+    mv = memoryview(dados)
+    try:
+        magico, versao, tipo, _ = CABECALHO.unpack_from(mv, 0)
+        if magico != MAGICO or versao != VERSAO or tipo != TIPO_LSU:
+            raise ErroPacote(f"cabeçalho inválido (mágico={magico}, versão={versao}, tipo={tipo})")
+        (quantidade,) = CONTAGEM.unpack_from(mv, CABECALHO.size)
+
+        lsas = []
+        pos = CABECALHO.size + CONTAGEM.size
+        for _ in range(quantidade):
+            origem, seq, idade, n_vizinhos, n_prefixos, n_sumarios, checksum = LSA.unpack_from(mv, pos)
+            fim_vizinhos = pos + LSA.size + n_vizinhos * VIZINHO.size
+            fim_prefixos = fim_vizinhos + n_prefixos * PREFIXO.size
+            fim = fim_prefixos + n_sumarios * SUMARIO.size
+            if fim > len(mv):
+                raise ErroPacote("LSA truncada")
+            registro = mv[pos:fim]
+            if _checksum(registro) != checksum:
+                raise ErroPacote("checksum inválido")
+
+            vizinhos = {}
+            for ip, custo in VIZINHO.iter_unpack(mv[pos + LSA.size:fim_vizinhos]):
+                ip = socket.inet_ntoa(ip.to_bytes(4, "big"))
+                vizinhos[ip] = (ip, custo)
+            prefixos = [f"{socket.inet_ntoa(rede.to_bytes(4, 'big'))}/{tamanho}"
+                        for rede, tamanho in PREFIXO.iter_unpack(mv[fim_vizinhos:fim_prefixos])]
+            sumarios = {f"{socket.inet_ntoa(rede.to_bytes(4, 'big'))}/{tamanho}": custo
+                        for rede, tamanho, custo in SUMARIO.iter_unpack(mv[fim_prefixos:fim])}
+            lsas.append({
+                "id": socket.inet_ntoa(origem.to_bytes(4, "big")),
+                "vizinhos": vizinhos,
+                "prefixos": prefixos,
+                "sumarios": sumarios,
+                "seq": seq,
+                "idade": idade,
+            })
+            pos = fim
+        return lsas
+    except struct.error as e:
+        raise ErroPacote(f"pacote truncado: {e}") from e
+
+
+def codificar_hello(tipo: int, remetente: str, seq: int, carimbo: float, area: int = 0) -> bytes:
+    """
+    Monta um pacote HELLO ou a resposta a um HELLO.
+
+    Args:
+        tipo: TIPO_HELLO ou TIPO_HELLO_RESPOSTA
+        remetente: IP (identificador) do roteador que envia o pacote
+        seq: Sequência do HELLO
+        carimbo: Instante de envio do HELLO no relógio de quem o originou
+        area: Área do enlace com o vizinho
+
+    Returns:
+        Datagrama pronto para envio
+    """
+    return CABECALHO.pack(MAGICO, VERSAO, tipo, area) + HELLO.pack(
+        struct.unpack("!I", socket.inet_aton(remetente))[0], seq, carimbo)
+
+
+def decodificar_hello(dados: bytes) -> Tuple[str, int, float]:
+    """
+    Decodifica um pacote HELLO ou uma resposta a HELLO.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        Tupla (roteador remetente, sequência, carimbo de tempo)
+
+    Raises:
+        ErroPacote: Se o pacote estiver truncado
+    """
+    try:
+        remetente, seq, carimbo = HELLO.unpack_from(dados, CABECALHO.size)
+    except struct.error as e:
+        raise ErroPacote(f"hello truncado: {e}") from e
+    return socket.inet_ntoa(remetente.to_bytes(4, "big")), seq, carimbo
+
+
+def _fatiar(itens: List[Any], tamanho: int) -> List[List[Any]]:
+    """Divide uma lista em partes de no máximo `tamanho` itens."""
+    return [itens[i:i + tamanho] for i in range(0, len(itens), tamanho)]
+
+
+def codificar_resumos(tipo: int, chaves: List[Tuple[str, int]], area: int = 0) -> List[bytes]:
+    """
+    Monta pacotes de confirmação (LS-Ack), descrição da LSDB (DBD) ou pedido de LSAs (LSR).
+
+    Os três tipos carregam a mesma lista de (origem, sequência); listas longas
+    são divididas em vários pacotes.
+
+    Args:
+        tipo: TIPO_LSACK, TIPO_DBD ou TIPO_LSR
+        chaves: Lista de (origem, sequência)
+        area: Área do enlace com o vizinho
+
+    Returns:
+        Datagramas prontos para envio; uma lista vazia gera um único pacote vazio
+    """
+    pacotes = []
+    for parte in _fatiar(chaves, RESUMOS_POR_PACOTE) or [[]]:
+        partes = [CABECALHO.pack(MAGICO, VERSAO, tipo, area), CONTAGEM.pack(len(parte))]
+        partes.extend(RESUMO.pack(struct.unpack("!I", socket.inet_aton(origem))[0], seq) for origem, seq in parte)
+        pacotes.append(b"".join(partes))
+    return pacotes
+
+
+def decodificar_resumos(dados: bytes) -> List[Tuple[str, int]]:
+    """
+    Decodifica um pacote LS-Ack, DBD ou LSR.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        Lista de (origem, sequência)
+
+    Raises:
+        ErroPacote: Se o pacote estiver truncado
+    """
+    mv = memoryview(dados)
+    try:
+        (quantidade,) = CONTAGEM.unpack_from(mv, CABECALHO.size)
+        inicio = CABECALHO.size + CONTAGEM.size
+        fim = inicio + quantidade * RESUMO.size
+        if fim > len(mv):
+            raise ErroPacote("resumo truncado")
+        return [(socket.inet_ntoa(origem.to_bytes(4, "big")), seq) for origem, seq in RESUMO.iter_unpack(mv[inicio:fim])]
+    except struct.error as e:
+        raise ErroPacote(f"resumo truncado: {e}") from e
+
+
+def chaves_lsu(dados: bytes) -> Optional[List[Tuple[str, int]]]:
+    """
+    Lê apenas a origem e a sequência de cada LSA do datagrama, sem decodificá-lo.
+
+    Usado para descartar cópias já conhecidas antes da decodificação completa.
+    Aceita tanto o formato binário quanto o JSON legado.
+
+    Args:
+        dados: Datagrama recebido
+
+    Returns:
+        Lista de (origem, sequência), ou None se o cabeçalho não puder ser lido
+        sem decodificar o pacote
+    """
+    if not eh_binario(dados):
+        encontrado = CHAVE_JSON.match(dados)
+        if encontrado is None:
+            return None
+        return [(encontrado.group(1).decode(), int(encontrado.group(2)))]
+
+    mv = memoryview(dados)
+    try:
+        if CABECALHO.unpack_from(mv, 0)[1:3] != (VERSAO, TIPO_LSU):
+            return None
+        (quantidade,) = CONTAGEM.unpack_from(mv, CABECALHO.size)
+        chaves = []
+        pos = CABECALHO.size + CONTAGEM.size
+        for _ in range(quantidade):
+            origem, seq, n_vizinhos, n_prefixos, n_sumarios = CHAVE_LSA.unpack_from(mv, pos)
+            chaves.append((socket.inet_ntoa(origem), seq))
+            pos += LSA.size + n_vizinhos * VIZINHO.size + n_prefixos * PREFIXO.size + n_sumarios * SUMARIO.size
+        return chaves
+    except struct.error:
+        return None
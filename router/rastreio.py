@@ -0,0 +1,132 @@
+"""
+Rastreio das Etapas de cada LSA
+-------------------------------
+Este módulo registra, quando ativado, o instante em que cada LSA passa por
+cada etapa do caminho até a FIB: originação (no roteador de origem),
+recebimento do datagrama, decodificação, aceitação na LSDB, inundação
+(enfileiramento e envio aos vizinhos), início e fim do SPF e programação das
+rotas. Ao fim de cada execução do SPF, as LSAs que ela processou viram um
+registro JSON por linha em `rastros/rastro_<nome>.jsonl`, gravado em
+segundo plano. O arquivo é acumulado entre execuções; cada registro traz o
+instante de partida do roteador que o gravou (`execucao`), já que as
+sequências das LSAs recomeçam quando ele reinicia.
+
+Os instantes usam o relógio de parede (time.time), compartilhado pelos
+containers do mesmo host, de modo que os registros de todos os roteadores
+podem ser combinados por `scripts_test/analisar_rastros.py` para medir a
+propagação de cada LSA a partir da origem.
+"""
+
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Chave = Tuple[str, int]  # (origem, sequência)
+
+
+class Rastreador:
+    """Classe que acumula os instantes das etapas de cada LSA e grava os registros concluídos."""
+
+    def __init__(self, roteador: str, caminho: str, ativo: bool = False,
+                 ao_falhar: Optional[Callable[[Exception], None]] = None):
+        """
+        Args:
+            roteador: IP (identificador) do roteador local
+            caminho: Arquivo JSON-lines onde os registros são acrescentados
+            ativo: Se o rastreio está ligado; desligado, todos os métodos retornam imediatamente
+            ao_falhar: Chamada com o erro quando os registros não podem ser gravados
+        """
+        self.roteador = roteador
+        self.caminho = caminho
+        self.ativo = ativo
+        self.ao_falhar = ao_falhar
+        self.execucao = time.time()  # Identifica esta execução do roteador nos registros
+        self.abertos: Dict[Chave, Dict[str, float]] = {}  # LSA -> etapa -> instante
+        self.aguardando_spf: List[Chave] = []  # LSAs aceitas desde o início do último SPF
+        self.concluidos: List[str] = []  # Linhas JSON ainda não gravadas
+
+    def aceitar(self, chave: Chave, etapas: Dict[str, float]) -> None:
+        """
+        Abre o registro de uma LSA aceita na LSDB (ou originada localmente).
+
+        Args:
+            chave: (origem, sequência) da LSA
+            etapas: Instantes das etapas já ocorridas (ex: recebido, decodificado)
+        """
+        if not self.ativo:
+            return
+        registro = self.abertos.get(chave)
+        if registro is None:
+            registro = self.abertos[chave] = {}
+            self.aguardando_spf.append(chave)
+        for etapa, instante in etapas.items():
+            registro.setdefault(etapa, instante)
+        registro.setdefault("aceito", time.time())
+
+    def marcar(self, chaves: Iterable[Chave], etapa: str, instante: Optional[float] = None) -> None:
+        """
+        Registra uma etapa das LSAs em aberto; só a primeira ocorrência de cada etapa é mantida.
+
+        Args:
+            chaves: LSAs (origem, sequência)
+            etapa: Nome da etapa
+            instante: Instante da etapa (padrão: agora)
+        """
+        if not self.ativo:
+            return
+        instante = time.time() if instante is None else instante
+        for chave in chaves:
+            registro = self.abertos.get(chave)
+            if registro is not None:
+                registro.setdefault(etapa, instante)
+
+    def iniciar_spf(self) -> List[Chave]:
+        """
+        Marca o início do SPF nas LSAs aceitas desde a execução anterior.
+
+        Returns:
+            LSAs processadas por esta execução
+        """
+        if not self.ativo:
+            return []
+        lote, self.aguardando_spf = self.aguardando_spf, []
+        self.marcar(lote, "spf_inicio")
+        return lote
+
+    def concluir(self, lote: List[Chave]) -> None:
+        """
+        Fecha os registros das LSAs processadas por uma execução do SPF.
+
+        Args:
+            lote: LSAs retornadas por iniciar_spf
+        """
+        for origem, seq in lote:
+            etapas = self.abertos.pop((origem, seq), None)
+            if etapas is not None:
+                self.concluidos.append(json.dumps(
+                    {"roteador": self.roteador, "execucao": self.execucao, "origem": origem, "seq": seq,
+                     "etapas": etapas},
+                    separators=(",", ":")))
+
+    def _gravar(self, linhas: List[str]) -> None:
+        """Acrescenta as linhas ao arquivo de registros."""
+        with open(self.caminho, "a") as file:
+            file.write("\n".join(linhas) + "\n")
+
+    async def laco(self, intervalo: float) -> None:
+        """
+        Tarefa que grava periodicamente os registros concluídos.
+
+        Args:
+            intervalo: Tempo (s) entre gravações
+        """
+        while self.ativo:
+            await asyncio.sleep(intervalo)
+            if self.concluidos:
+                linhas, self.concluidos = self.concluidos, []
+                try:
+                    await asyncio.to_thread(self._gravar, linhas)
+                except OSError as e:
+                    if self.ao_falhar is not None:
+                        self.ao_falhar(e)
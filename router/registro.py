@@ -0,0 +1,169 @@
+"""
+Registro de Logs do Roteador
+----------------------------
+Este módulo tira a escrita dos logs do caminho crítico do roteador. Cada
+mensagem é filtrada por nível e por tipo e colocada em uma fila (SimpleQueue,
+sem bloqueio para quem registra); uma thread dedicada formata e escreve as
+mensagens na saída padrão, em texto (formato histórico) ou em JSON, uma
+mensagem por linha.
+
+Mensagens frequentes (ex: cada rota instalada) recebem um tipo e são
+limitadas por um balde de fichas por tipo: até `rajada` mensagens seguidas e
+`taxa` por segundo em média. A primeira mensagem liberada depois de uma
+supressão informa quantas foram descartadas.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Níveis aceitos na configuração e nas chamadas
+NIVEIS = {"debug": logging.DEBUG, "info": logging.INFO, "aviso": logging.WARNING, "erro": logging.ERROR}
+NOMES_NIVEIS = {valor: nome for nome, valor in NIVEIS.items()}
+
+
+class _FiltroTaxa(logging.Filter):
+    """Filtro que limita a quantidade de mensagens de cada tipo (balde de fichas)."""
+
+    def __init__(self, taxa: float, rajada: int):
+        """
+        Args:
+            taxa: Mensagens por segundo liberadas em média para cada tipo (<= 0 desativa o limite)
+            rajada: Mensagens seguidas liberadas antes de o limite atuar
+        """
+        super().__init__()
+        self.taxa = taxa
+        self.rajada = rajada
+        # tipo -> [fichas disponíveis, instante da última reposição, mensagens suprimidas]
+        self.baldes: Dict[str, List[float]] = {}
+        # Mensagens são registradas pelo laço de eventos e pelas threads auxiliares
+        self.lock = threading.Lock()
+
+    def filter(self, registro: logging.LogRecord) -> bool:
+        tipo = getattr(registro, "tipo", None)
+        if tipo is None or self.taxa <= 0:
+            return True
+        with self.lock:
+            agora = time.monotonic()
+            balde = self.baldes.get(tipo)
+            if balde is None:
+                balde = self.baldes[tipo] = [float(self.rajada), agora, 0]
+            balde[0] = min(self.rajada, balde[0] + (agora - balde[1]) * self.taxa)
+            balde[1] = agora
+            if balde[0] < 1:
+                balde[2] += 1
+                return False
+            balde[0] -= 1
+            registro.suprimidas = int(balde[2])
+            balde[2] = 0
+            return True
+
+
+class _FormatoTexto(logging.Formatter):
+    """Formato histórico: "[data hora] [roteador] mensagem"."""
+
+    def __init__(self, roteador: str):
+        super().__init__()
+        self.roteador = roteador
+
+    def format(self, registro: logging.LogRecord) -> str:
+        data = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(registro.created))
+        mensagem = registro.getMessage()
+        suprimidas = getattr(registro, "suprimidas", 0)
+        if suprimidas:
+            mensagem += f" (+{suprimidas} mensagens '{registro.tipo}' suprimidas)"
+        return f"[{data}] [{self.roteador}] {mensagem}"
+
+
+class _FormatoJSON(logging.Formatter):
+    """Uma linha JSON por mensagem, com instante, nível, roteador e tipo."""
+
+    def __init__(self, roteador: str):
+        super().__init__()
+        self.roteador = roteador
+
+    def format(self, registro: logging.LogRecord) -> str:
+        linha = {
+            "instante": registro.created,
+            "nivel": NOMES_NIVEIS.get(registro.levelno, registro.levelname.lower()),
+            "roteador": self.roteador,
+            "mensagem": registro.getMessage(),
+        }
+        tipo = getattr(registro, "tipo", None)
+        if tipo is not None:
+            linha["tipo"] = tipo
+        if getattr(registro, "suprimidas", 0):
+            linha["suprimidas"] = registro.suprimidas
+        return json.dumps(linha, ensure_ascii=False)
+
+
+class Logger:
+    """Classe para gerenciar logs do roteador."""
+
+    _logger = logging.getLogger("roteador")
+    _escritor: Optional[logging.handlers.QueueListener] = None
+
+    @staticmethod
+    def configurar(roteador: str, nivel: str = "info", formato: str = "texto", taxa: float = 20.0,
+                   rajada: int = 50) -> None:
+        """
+        Inicia a thread de escrita dos logs.
+
+        Args:
+            roteador: Identificador do roteador incluído em cada mensagem
+            nivel: Nível mínimo registrado ("debug", "info", "aviso" ou "erro")
+            formato: "texto" ou "json" (uma linha JSON por mensagem)
+            taxa: Mensagens por segundo liberadas em média para cada tipo (<= 0 desativa o limite)
+            rajada: Mensagens seguidas de um mesmo tipo liberadas antes de o limite atuar
+        """
+        Logger.encerrar()
+        logger = Logger._logger
+        logger.handlers.clear()
+        logger.filters.clear()
+        logger.propagate = False
+        logger.setLevel(NIVEIS.get(nivel, logging.INFO))
+        logger.addFilter(_FiltroTaxa(taxa, rajada))
+
+        fila: queue.SimpleQueue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(fila))
+        saida = logging.StreamHandler(sys.stdout)
+        saida.setFormatter(_FormatoJSON(roteador) if formato == "json" else _FormatoTexto(roteador))
+        Logger._escritor = logging.handlers.QueueListener(fila, saida)
+        Logger._escritor.start()
+        atexit.register(Logger.encerrar)
+
+    @staticmethod
+    def encerrar() -> None:
+        """Escreve as mensagens pendentes e para a thread de escrita."""
+        if Logger._escritor is not None:
+            Logger._escritor.stop()
+            Logger._escritor = None
+
+    @staticmethod
+    def log(message: str, nivel: str = "info", tipo: Optional[str] = None) -> None:
+        """
+        Registra uma mensagem de log.
+
+        Args:
+            message: Mensagem a ser registrada
+            nivel: Nível da mensagem ("debug", "info", "aviso" ou "erro")
+            tipo: Tipo da mensagem, usado no limite de taxa; mensagens sem tipo não são limitadas
+        """
+        Logger._logger.log(NIVEIS.get(nivel, logging.INFO), message, extra={"tipo": tipo})
+
+    @staticmethod
+    def erro(message: str, tipo: Optional[str] = None) -> None:
+        """
+        Registra uma mensagem de erro.
+
+        Args:
+            message: Mensagem a ser registrada
+            tipo: Tipo da mensagem, usado no limite de taxa
+        """
+        Logger.log(message, "erro", tipo)
@@ -6,112 +6,124 @@ um roteador utilizando o algoritmo de estado de enlace (Link State)
 para determinar as melhores rotas em uma rede de computadores.
 """
 
+import ipaddress
 import json
 import os
+import asyncio
 import socket
-import threading
 import time
 import subprocess
-from typing import Dict, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Any, Optional
 from formater import Formatter
-from dycastra import dijkstra
+from dycastra import ordenar_saltos, alternativas_sem_laco
+from agendador import AgendadorSPF
+from netlink import RtNetlink
+from fib import FIB
+import protocolo
+from hello import TabelaVizinhos, Vizinho, ADJ_TROCA, ADJ_COMPLETA
+from inundacao import Inundacao
+from envio import EnvioEmLote, FilasSaida
+from areas import Area, RoteamentoAreas, distribuir_prefixos
+from partida import aguardar_inicio
+from gravacao import GravadorEstado
+from registro import Logger
+from metricas import Amostra, Histograma, Metricas
+from rastreio import Rastreador
 
 ROTEADOR_IP = os.getenv("my_ip")
 ROTEADOR_NAME = os.getenv('my_name')
 VIZINHOS = Formatter.formatar_vizinhos(os.getenv("vizinhos"))
+AREAS = Formatter.formatar_areas(os.getenv("vizinhos"))
+
+# Área das redes conectadas sem vizinho (ex: redes de hosts); por padrão, a menor área dos enlaces
+AREA_PADRAO = Formatter.validar_area(int(os.getenv("area", min(AREAS.values(), default=0))))
 
 PORTA_LSA = 5000
+TAMANHO_MAXIMO_DATAGRAMA = 65535
 
-class Logger:
-    """Classe para gerenciar logs do roteador."""
+# Formato de envio das LSAs: "binario" (padrão) ou "json" (legado). O recebimento aceita ambos,
+# permitindo a convivência com roteadores antigos durante a transição.
+LSA_FORMATO = os.getenv("lsa_formato", "binario")
 
-    @staticmethod    
-    def log(message: str) -> None:  
-        """
-        Registra uma mensagem de log.
-        
-        Args:
-            message: Mensagem a ser registrada
-        """
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-        print(f"[{timestamp}] [{ROTEADOR_IP}] {message}", flush=True)
+# Protocolo Hello (segundos): intervalo entre HELLOs e tempo sem resposta até declarar o vizinho inativo
+HELLO_INTERVALO = float(os.getenv("hello_intervalo", "1"))
+HELLO_MORTO = float(os.getenv("hello_morto", "4"))
 
-class NetworkUtils:
-    """Classe para utilitários de rede."""
-    
-    @staticmethod
-    def _testar_ping(ip: str, result: Dict[str, Tuple[bool, float]], treadlock: threading.Lock) -> None:
-        """
-        Testa a conectividade com um IP via ping.
-        
-        Args:
-            ip: Endereço IP a ser testado
-            result: Dicionário para armazenar os resultados do ping
+# Métrica dos enlaces: peso da EWMA do RTT, largura (s) de cada faixa de custo (0 usa o custo
+# configurado), diferença mínima em faixas e tempo mínimo (s) entre anúncios por mudança de custo
+CUSTO_ALFA = float(os.getenv("custo_alfa", "0.2"))
+CUSTO_FAIXA = float(os.getenv("custo_faixa", "0.001"))
+CUSTO_LIMIAR = int(os.getenv("custo_limiar", "2"))
+CUSTO_ESPERA = float(os.getenv("custo_espera", "10"))
 
-        Returns:
-            True se ping bem sucedido, False caso contrário
-        """
-        is_alive = False
-        init_ping = time.time()
-        try:
-            process = subprocess.run(
-                ["ping", "-c", "5", "-W", "1", ip],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-            end_ping = time.time()
-            is_alive = process.returncode == 0
-        except Exception:
-            ...
-            
-        with treadlock:
-            tempo_ping = end_ping - init_ping   
-            result[ip] = (is_alive, tempo_ping)
+# Envelhecimento das LSAs (segundos): intervalo de reoriginação da LSA local e idade máxima (MaxAge),
+# a partir da qual LSAs de roteadores que pararam de anunciar são removidas da LSDB
+LSA_REFRESH = float(os.getenv("lsa_refresh", "1800"))
+LSA_IDADE_MAXIMA = Formatter.validar_idade_maxima(float(os.getenv("lsa_idade_maxima", "3600")))
 
-    
-    @staticmethod
-    def realizar_pings(vizinhos: Dict[str, Tuple[str, int]]) -> Dict[str, Tuple[str, str]]:
-        """
-        Executa pings para todos os vizinhos em paralelo e retorna os ativos.
-        
-        Args:
-            vizinhos: Dicionário de vizinhos
-            
-        Returns:
-            Dicionário de vizinhos ativos (nome, ip)
-        """
-        vizinhos_ativos = {}
-        threads = []
-        result = {}
-        treadlock = threading.Lock()
-        
-        for viz, (ip, ant_custo) in vizinhos.items():
-            thread = threading.Thread(target=NetworkUtils._testar_ping, args=(ip, result, treadlock))
-            thread.daemon = True
-            thread.start()
-            threads.append((viz, ip, thread))
+# Inundação confiável (segundos): intervalo de retransmissão de LSAs não confirmadas e
+# atraso com que as confirmações (LS-Ack) são acumuladas antes do envio
+LSA_RETRANSMISSAO = float(os.getenv("lsa_retransmissao", "1"))
+LSA_ACK_ATRASO = float(os.getenv("lsa_ack_atraso", "0.1"))
 
-        for viz, ip, thread in threads:
-            thread.join()
-            is_alive, tempo_ping = result[ip]
-            if is_alive:
-                vizinhos_ativos[viz] = (ip, tempo_ping)
-            else:
-                ...
-            
-        return vizinhos_ativos
+# Envio das LSAs: intervalo (s) de esvaziamento das filas de saída por vizinho e MTU usada para
+# empacotar várias LSAs por datagrama (0 descobre a MTU do caminho até cada vizinho)
+LSA_RITMO = float(os.getenv("lsa_ritmo", "0.01"))
+LSA_MTU = int(os.getenv("lsa_mtu", "0"))
+
+# Temporizadores do SPF (segundos): atraso inicial, espera entre execuções e limite do back-off
+SPF_ATRASO_INICIAL = float(os.getenv("spf_atraso_inicial", "0.05"))
+SPF_ESPERA = float(os.getenv("spf_espera", "0.2"))
+SPF_ESPERA_MAXIMA = float(os.getenv("spf_espera_maxima", "5"))
+
+# Reparo local: calcula alternativas livres de laços (LFA) após cada SPF e, quando um vizinho
+# cai, troca as rotas afetadas para a alternativa antes da reconvergência ("0" desativa)
+LFA_ATIVO = os.getenv("lfa", "1") != "0"
+
+# Backend de programação de rotas: "netlink" (padrão) ou "ip" (subprocessos)
+ROTAS_BACKEND = os.getenv("rotas_backend", "netlink")
+
+# Intervalo (segundos) entre reconciliações da FIB sombra com a tabela do kernel
+FIB_RECONCILIACAO = float(os.getenv("fib_reconciliacao", "30"))
+
+# Intervalo mínimo (segundos) entre gravações dos arquivos JSON da LSDB e das rotas
+GRAVACAO_INTERVALO = float(os.getenv("gravacao_intervalo", "0.5"))
+
+# Logs: nível mínimo ("debug", "info", "aviso" ou "erro"), formato ("texto" ou "json", uma linha por
+# mensagem) e limite por tipo de mensagem: até `log_rajada` seguidas e `log_taxa` por segundo (0 desativa)
+LOG_NIVEL = os.getenv("log_nivel", "info")
+LOG_FORMATO = os.getenv("log_formato", "texto")
+LOG_TAXA = float(os.getenv("log_taxa", "20"))
+LOG_RAJADA = int(os.getenv("log_rajada", "50"))
+
+# Porta TCP do endpoint HTTP de métricas no formato do Prometheus (0 desativa) e endereço em que
+# ele escuta (padrão: o IP do próprio roteador, e não todas as interfaces)
+METRICAS_PORTA = int(os.getenv("metricas_porta", "9100"))
+METRICAS_ENDERECO = os.getenv("metricas_endereco", ROTEADOR_IP)
+
+# Rastreio das etapas de cada LSA (recebimento, decodificação, aceitação, inundação, SPF e FIB),
+# gravado em rastros/rastro_<nome>.jsonl ("1" ativa)
+RASTREIO_ATIVO = os.getenv("rastreio", "0") == "1"
+
+# Intervalo máximo (segundos) entre leituras do start.txt enquanto o roteador aguarda o início;
+# com inotify a escrita do arquivo acorda o roteador antes disso
+PARTIDA_INTERVALO = float(os.getenv("partida_intervalo", "1"))
 
 class LSAHandler:
     """Classe para manipulação de LSA (Link State Advertisement)."""
     
     @staticmethod
-    def criar_pacote_lsa(roteador_id: str, seq: int, vizinhos: Dict[str, Tuple[str, int]]) -> Dict[str, Any]:    
+    def criar_pacote_lsa(roteador_id: str, seq: int, vizinhos: Dict[str, Tuple[str, int]], prefixos: List[str],
+                         sumarios: Optional[Dict[str, float]] = None) -> Dict[str, Any]:    
         """
         Cria um pacote LSA com informações atuais do roteador.
         
         Args:
             roteador_id: ID do roteador
             seq: Número de sequência do pacote LSA
+            vizinhos: Vizinhos ativos da área {nome: (ip, custo)}
+            prefixos: Redes conectadas às interfaces do roteador na área
+            sumarios: Rotas de outras áreas anunciadas por um roteador de borda {prefixo: custo}
             
         Returns:
             Dicionário contendo o pacote LSA formatado
@@ -120,140 +132,287 @@ class LSAHandler:
             pacote = {
                 "id": roteador_id,
                 "vizinhos": {viz: (ip, custo) for viz, (ip, custo) in vizinhos.items()},
-                "seq": seq
+                "prefixos": list(prefixos),
             }
+            if sumarios:
+                pacote["sumarios"] = dict(sumarios)
+            pacote["seq"] = seq
             return pacote
         except Exception as e:
-            Logger.log(f"Erro ao criar pacote LSA: {e}")
+            Logger.erro(f"Erro ao criar pacote LSA: {e}")
             return {}
         
     @staticmethod
-    def enviar_lsa_para_vizinho(sock: socket.socket, mensagem: bytes, vizinho: str, ip: str) -> bool:
+    def serializar(lsa: Dict[str, Any], area: int = 0) -> bytes:
         """
-        Envia um LSA para um vizinho específico.
+        Serializa um LSA no formato configurado em `lsa_formato`.
         
         Args:
-            sock: Socket UDP para envio
-            mensagem: Mensagem LSA serializada
-            vizinho: Identificador do vizinho
-            ip: Endereço IP do vizinho
+            lsa: Pacote LSA
+            area: Área à qual a LSA pertence
             
         Returns:
-            True se o envio foi bem sucedido, False caso contrário
+            Mensagem pronta para envio
         """
-        try:
-            sock.sendto(mensagem, (ip, PORTA_LSA))
-            # Logger.log(f"LSA enviado para {vizinho} ({ip})")
-            return True
-        except Exception as e:
-            Logger.log(f"Erro ao enviar LSA para {vizinho} ({ip}): {e}")
-            return False
+        if LSA_FORMATO == "json":
+            return json.dumps(LSAHandler._json_area(lsa, area)).encode()
+        return protocolo.codificar_lsu([lsa], area)
+    
+    @staticmethod
+    def serializar_varias(lsas: List[Dict[str, Any]], tamanho_maximo: int = protocolo.TAMANHO_MAXIMO_UDP,
+                          area: int = 0) -> List[bytes]:
+        """
+        Serializa várias LSAs no menor número de datagramas possível.
+        
+        Args:
+            lsas: LSAs a enviar
+            tamanho_maximo: Tamanho máximo (bytes) de cada datagrama
+            area: Área à qual as LSAs pertencem
+            
+        Returns:
+            Mensagens prontas para envio (uma por LSA no formato JSON)
+        """
+        if LSA_FORMATO == "json":
+            return [json.dumps(LSAHandler._json_area(lsa, area)).encode() for lsa in lsas]
+        return protocolo.codificar_lsus(lsas, tamanho_maximo, area)
+    
+    @staticmethod
+    def _json_area(lsa: Dict[str, Any], area: int) -> Dict[str, Any]:
+        """Copia a LSA com o campo "area" logo após o "id", mantendo "id" primeiro e "seq" por último."""
+        return {"id": lsa["id"], "area": area, **{chave: valor for chave, valor in lsa.items() if chave != "id"}}
+    
+    @staticmethod
+    def desserializar(dados: bytes) -> List[Dict[str, Any]]:
+        """
+        Decodifica um datagrama recebido, detectando o formato pelo primeiro byte.
+        
+        Args:
+            dados: Datagrama recebido
+            
+        Returns:
+            Lista de LSAs contidas no datagrama
+        """
+        if protocolo.eh_binario(dados):
+            return protocolo.decodificar_lsu(dados)
+        lsa = json.loads(dados.decode())
+        lsa.pop("area", None)
+        return [lsa]
         
 class NetworkInterface:
     
+    netlink: Optional[RtNetlink] = None
+    fib: Optional[FIB] = None
+    operacoes = {"add": 0, "del": 0, "replace": 0}  # Operações de rota aplicadas com sucesso
+    duracao_aplicacao: Optional[Histograma] = None  # Duração de cada lote aplicado ao kernel
+    
+    @staticmethod
+    def inicializar() -> None:
+        """
+        Abre o socket rtnetlink (mantendo o caminho via `ip route` caso não seja possível)
+        e carrega a FIB sombra a partir da tabela atual do kernel.
+        """
+        if ROTAS_BACKEND == "netlink":
+            try:
+                NetworkInterface.netlink = RtNetlink()
+            except OSError as e:
+                Logger.log(f"Netlink indisponível, usando 'ip route': {e}", "aviso")
+        
+        NetworkInterface.fib = FIB(NetworkInterface.listar_rotas_sistema, NetworkInterface.aplicar_rotas)
+        try:
+            NetworkInterface.fib.reconciliar()
+        except Exception as e:
+            Logger.erro(f"Erro ao carregar rotas existentes: {e}")
+    
     @staticmethod
-    def obter_rotas_existentes(rotas: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    def aguardar_alteracao_rotas(timeout: float) -> bool:
         """
-        Obtém todas as rotas existentes no sistema e compara com as novas rotas.
+        Aguarda até o próximo ciclo de reconciliação da FIB.
         
         Args:
-            rotas (Dict[str, str]): Dicionário com as novas rotas a serem configuradas (destino -> próximo_salto)
+            timeout (float): Intervalo máximo de espera em segundos
+            
+        Returns:
+            bool: True se o kernel notificou uma alteração de rota feita por terceiros
+        """
+        if NetworkInterface.netlink is not None:
+            try:
+                return NetworkInterface.netlink.aguardar_alteracao_externa(timeout)
+            except OSError as e:
+                Logger.erro(f"Erro ao monitorar rotas via netlink: {e}")
+        time.sleep(timeout)
+        return False
+    
+    @staticmethod
+    def listar_prefixos() -> List[str]:
+        """
+        Lê as redes IPv4 conectadas às interfaces, que o roteador anuncia na sua LSA.
+        
+        Returns:
+            List[str]: Prefixos conectados (ex: 172.20.1.0/24), sem o loopback
+        """
+        if NetworkInterface.netlink is not None:
+            try:
+                return NetworkInterface.netlink.listar_prefixos()
+            except OSError as e:
+                Logger.erro(f"Erro ao ler prefixos via netlink: {e}")
+        
+        prefixos = []
+        resultado = subprocess.run(["ip", "-o", "-4", "addr", "show"], capture_output=True, text=True, check=True)
+        # ex: 2: eth0    inet 172.20.1.3/24 brd 172.20.1.255 scope global eth0
+        for linha in resultado.stdout.splitlines():
+            partes = linha.split()
+            if "inet" not in partes or "host" in partes:
+                continue
+            rede = str(ipaddress.IPv4Network(partes[partes.index("inet") + 1], strict=False))
+            if rede not in prefixos:
+                prefixos.append(rede)
+        return prefixos
+    
+    @staticmethod
+    def listar_rotas_sistema() -> Tuple[Dict[str, Tuple[str, ...]], Dict[str, Any]]:
+        """
+        Lê a tabela de rotas do sistema.
         
         Returns:
-            Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]: 
-                - Dicionário com as novas rotas a serem adicionadas
-                - Dicionário com as rotas a serem removidas
-                - Dicionário com as rotas a serem substituídas
+            Tuple[Dict[str, Tuple[str, ...]], Dict[str, Any]]:
+                - Rotas com próximo salto (rede -> próximos saltos ordenados)
+                - Rotas diretamente conectadas (rede -> interface)
         """
+        if NetworkInterface.netlink is not None:
+            try:
+                return NetworkInterface.netlink.listar_rotas()
+            except OSError as e:
+                Logger.erro(f"Erro ao ler rotas via netlink: {e}")
+        
         rotas_existentes = {}
         rotas_sistema = {}
+        resultado = subprocess.run(
+            ["ip", "route", "show"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
         
-        rotas_adicionar = {}
-        rotas_remover = {}
-        rotas_replase = {}
-        
-        try:
-            # Padroniza formato das novas rotas
-            novas_rotas = {}
-            for destino, proximo_salto in rotas.items():
-                parts = destino.split('.')
-                network_prefix = '.'.join(parts[:3])
-                network = f"{network_prefix}.0/24"
-                novas_rotas[network] = proximo_salto
+        # Processa cada linha do resultado; rotas multipath trazem um
+        # "nexthop via X" indentado por próximo salto após a linha da rede
+        rede_multipath = None
+        for linha in resultado.stdout.splitlines():
+            partes = linha.split()
+            if not partes:
+                continue
             
-            # Obtém rotas existentes do sistema
-            resultado = subprocess.run(
-                ["ip", "route", "show"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            if partes[0] == "nexthop":
+                if rede_multipath is not None and partes[1] == "via":
+                    rotas_existentes[rede_multipath] = ordenar_saltos(rotas_existentes[rede_multipath] + (partes[2],))
+                continue
+            rede_multipath = None
             
-            # Processa cada linha do resultado
-            for linha in resultado.stdout.splitlines():
-                partes = linha.split()
+            if partes[0] == "default":
+                continue
+            elif len(partes) == 1 or partes[1] != "dev" and "via" not in partes:
+                rede_multipath = partes[0]
+                rotas_existentes[rede_multipath] = ()
+            elif partes[1] == "via":
+                rede = partes[0]  # ex: 172.20.5.0/24
+                proximo_salto = partes[2]  # ex: 172.20.4.3
+                rotas_existentes[rede] = (proximo_salto,)
+                
+            elif partes[1] == 'dev':
+                rede = partes[0]
+                proximo_salto = partes[-1]
+                rotas_sistema[rede] = proximo_salto
+        
+        return rotas_existentes, rotas_sistema
+    
+    @staticmethod
+    def aplicar_rotas(rotas_adicionar: Dict[str, Tuple[str, ...]], rotas_remover: Dict[str, Tuple[str, ...]],
+                      rotas_replase: Dict[str, Tuple[str, ...]]) -> None:
+        """
+        Aplica as alterações na tabela de rotas, em lote via netlink ou uma a uma via `ip route`.
+        
+        Args:
+            rotas_adicionar (Dict[str, Tuple[str, ...]]): Rotas a adicionar (rede -> próximos saltos)
+            rotas_remover (Dict[str, Tuple[str, ...]]): Rotas a remover (rede -> próximos saltos)
+            rotas_replase (Dict[str, Tuple[str, ...]]): Rotas a substituir (rede -> próximos saltos)
+        """
+        inicio = time.perf_counter()
+        if NetworkInterface.netlink is not None:
+            try:
+                resultados = NetworkInterface.netlink.aplicar(rotas_adicionar, rotas_remover, rotas_replase)
+            except OSError as e:
+                Logger.erro(f"Erro ao programar rotas via netlink: {e}")
+            else:
+                if NetworkInterface.duracao_aplicacao is not None:
+                    NetworkInterface.duracao_aplicacao.observar(time.perf_counter() - inicio)
+                mensagens = {"add": "Rota adicionada", "del": "Rota removida", "replace": "Rota Alterada"}
+                for operacao, destino, proximos_saltos, erro in resultados:
+                    if erro:
+                        Logger.erro(f"Erro ao aplicar rota ({operacao} {destino}): {os.strerror(erro)}", "rota")
+                        continue
+                    NetworkInterface.operacoes[operacao] += 1
+                    if proximos_saltos is None:
+                        Logger.log(f"{mensagens[operacao]}: {destino}", tipo="rota")
+                    else:
+                        Logger.log(f"{mensagens[operacao]}: {destino} via {', '.join(proximos_saltos)}", tipo="rota")
+                return
+        
+        for destino in rotas_remover.keys():
+            NetworkInterface.remover_interfaces(destino)
                 
-                if partes[0] != "default" and partes[1] == "via":
-                    rede = partes[0]  # ex: 172.20.5.0/24
-                    proximo_salto = partes[2]  # ex: 172.20.4.3
-                    rotas_existentes[rede] = proximo_salto
-                    
-                elif partes[1] == 'dev':
-                    rede = partes[0]
-                    proximo_salto = partes[-1]
-                    rotas_sistema[rede] = proximo_salto
+        for destino, proximos_saltos in rotas_adicionar.items():
+            NetworkInterface.adicionar_interface(destino, proximos_saltos)
                 
-            # Replase rotas que mudaram
-            for rede, proximo_salto in novas_rotas.items():
-                if (rede in rotas_existentes) and (rotas_existentes[rede] != proximo_salto):
-                    rotas_replase[rede] = proximo_salto
-                    
-            # Adicionar rotas inexistentes
-            for rede, proximo_salto in novas_rotas.items():
-                if (rede not in rotas_existentes) and (rede not in rotas_sistema):
-                    rotas_adicionar[rede] = proximo_salto
-            
-            # Remover rotas que não estão mais ativas
-            for rede, proximo_salto in rotas_existentes.items():
-                if (rede not in novas_rotas):
-                    rotas_remover[rede] = proximo_salto
-                    
-            return rotas_adicionar, rotas_remover, rotas_replase
+        for destino, proximos_saltos in rotas_replase.items():
+            NetworkInterface.replase_interface(destino, proximos_saltos)
         
-        except Exception as e:
-            Logger.log(f"Erro ao obter rotas existentes: {e}")
-            return {}, {}, {}
+        if NetworkInterface.duracao_aplicacao is not None:
+            NetworkInterface.duracao_aplicacao.observar(time.perf_counter() - inicio)
+    
+    @staticmethod
+    def argumentos_saltos(proximos_saltos: Tuple[str, ...]) -> List[str]:
+        """
+        Monta os argumentos de `ip route` para um ou mais próximos saltos.
         
+        Args:
+            proximos_saltos (Tuple[str, ...]): Próximos saltos da rota
+            
+        Returns:
+            List[str]: ["via", X] ou, para ECMP, ["nexthop", "via", X, "nexthop", "via", Y, ...]
+        """
+        if len(proximos_saltos) == 1:
+            return ["via", proximos_saltos[0]]
+        argumentos = []
+        for salto in proximos_saltos:
+            argumentos += ["nexthop", "via", salto]
+        return argumentos
+    
     @staticmethod
-    def adicionar_interface(destino: str, proximo_salto: str):
+    def adicionar_interface(destino: str, proximos_saltos: Tuple[str, ...]):
         """
-        Configura a interface de rede para o próximo salto.
+        Configura a interface de rede para os próximos saltos.
         
         Args:
-            destino (str): Endereço IP de destino (exemplo: 172.21.8.3)
-            proximo_salto (str): Endereço IP do próximo salto (exemplo: 172.21.1.3)
+            destino (str): Rede de destino (exemplo: 172.21.8.0/24)
+            proximos_saltos (Tuple[str, ...]): Endereços IP dos próximos saltos (exemplo: ("172.21.1.3",))
             
         Returns:
             bool: True se a configuração foi bem sucedida, False caso contrário
         """
         try:
-            parts = destino.split('.')
-            network_prefix = '.'.join(parts[:3])
-            destino = f"{network_prefix}.0/24"
-                
-            command_add = f"ip route add {destino} via {proximo_salto}"
+            command_add = ["ip", "route", "add", destino] + NetworkInterface.argumentos_saltos(proximos_saltos)
             process = subprocess.run(
-                command_add.split(),
+                command_add,
                 capture_output=True,
             )
             if process.returncode == 0:
-                Logger.log(f"Rota adicionada: {destino} via {proximo_salto}")
+                NetworkInterface.operacoes["add"] += 1
+                Logger.log(f"Rota adicionada: {destino} via {', '.join(proximos_saltos)}", tipo="rota")
             else:
-                Logger.log(f"Erro ao adicionar rota: {process.stderr.decode()}")
+                Logger.erro(f"Erro ao adicionar rota: {process.stderr.decode()}", "rota")
         except subprocess.CalledProcessError as e:
-            Logger.log(f"Erro ao adicionar rota: {e}")
+            Logger.erro(f"Erro ao adicionar rota: {e}", "rota")
         except Exception as e:
-            Logger.log(f"Erro inesperado ao adicionar rota: {e}")
+            Logger.erro(f"Erro inesperado ao adicionar rota: {e}", "rota")
 
     @staticmethod
     def remover_interfaces(destino: str) -> None:
@@ -266,82 +425,93 @@ class NetworkInterface:
         try:
             process = subprocess.run(["ip", "route", "del", destino], check=True)
             if process.returncode == 0:
-                Logger.log(f"Rota removida: {destino}")
+                NetworkInterface.operacoes["del"] += 1
+                Logger.log(f"Rota removida: {destino}", tipo="rota")
             else:
-                Logger.log(f"Erro ao remover rota: {process.stderr.decode()}")
+                Logger.erro(f"Erro ao remover rota: {process.stderr.decode()}", "rota")
         except subprocess.CalledProcessError as e:
-            Logger.log(f"Erro ao remover rota: {e}")
+            Logger.erro(f"Erro ao remover rota: {e}", "rota")
         except Exception as e:
-            Logger.log(f"Erro inesperado ao remover rota: {e}")
+            Logger.erro(f"Erro inesperado ao remover rota: {e}", "rota")
             
-    def salvar_lsdb_rotas_arquivo(lsdb: Dict[str, Any], rotas: Dict[str, str]) -> None:
-        """
-        Salva a LSDB e tabela de rotas em arquivos JSON.
-        
-        Args:
-            lsdb (Dict[str, Any]): Dicionário com a base de dados de estado de enlace
-            rotas (Dict[str, str]): Dicionário com a tabela de rotas
-        """
-        try:
-            with open(f"lsdb/lsdb_{ROTEADOR_NAME}.json", "w") as file:
-                json.dump(lsdb, file, indent=4)
-            with open(f"rotas/rotas_{ROTEADOR_NAME}.json", "w") as file:
-                json.dump(rotas, file, indent=4)
-        except Exception as e:
-            Logger.log(f"Erro ao salvar LSDB: {e}")
-            
-    def replase_interface(destino: str, proximo_salto: str) -> None:
+    def replase_interface(destino: str, proximos_saltos: Tuple[str, ...]) -> None:
         """
         Substitui a configuração existente de interface de rede.
         
         Args:
-            destino (str): Endereço IP de destino
-            proximo_salto (str): Novo endereço IP do próximo salto
+            destino (str): Rede de destino (exemplo: 172.21.8.0/24)
+            proximos_saltos (Tuple[str, ...]): Novos endereços IP dos próximos saltos
         """
         try:
-            parts = destino.split('.')
-            network_prefix = '.'.join(parts[:3])
-            destino = f"{network_prefix}.0/24"
-            
-            command = f"ip route replace {destino} via {proximo_salto}"
-            process = subprocess.run(command.split(), check=True)
+            command = ["ip", "route", "replace", destino] + NetworkInterface.argumentos_saltos(proximos_saltos)
+            process = subprocess.run(command, check=True)
             if process.returncode == 0:
-                Logger.log(f"Rota Alterada: {destino} via {proximo_salto}")
+                NetworkInterface.operacoes["replace"] += 1
+                Logger.log(f"Rota Alterada: {destino} via {', '.join(proximos_saltos)}", tipo="rota")
             else:
-                Logger.log(f"Erro ao substituir rota: {process.stderr.decode()}")
+                Logger.erro(f"Erro ao substituir rota: {process.stderr.decode()}", "rota")
         except subprocess.CalledProcessError as e:
-            Logger.log(f"Erro ao substituir rota: {e}")
+            Logger.erro(f"Erro ao substituir rota: {e}", "rota")
         except Exception as e:
-            Logger.log(f"Erro inesperado ao substituir rota: {e}")
+            Logger.erro(f"Erro inesperado ao substituir rota: {e}", "rota")
     
     @staticmethod
-    def config_interface(lsdb: Dict[str, Any], vizinhos: Dict[str, Tuple[str, int]]) -> None:
+    def config_interface(vizinhos: Dict[str, Tuple[str, int]], rotas: Dict[str, Tuple[str, ...]],
+                         alteracoes: Dict[str, Optional[Tuple[str, ...]]]) -> None:
         """
-        Configura as interfaces de rede com base na LSDB e vizinhos ativos.
+        Configura as interfaces de rede com base nas rotas calculadas e vizinhos ativos.
         
         Args:
-            lsdb (Dict[str, Any]): Base de dados de estado de enlace
             vizinhos (Dict[str, Tuple[str, int]]): Dicionário de vizinhos ativos
+            rotas (Dict[str, Tuple[str, ...]]): Rotas por prefixo, combinadas entre as áreas
+            alteracoes (Dict[str, Optional[Tuple[str, ...]]]): Prefixos que mudaram desde o último
+                recálculo (None se o prefixo deixou de ter rota)
+        
+        Dos próximos saltos de cada prefixo, só os que são vizinhos ativos são instalados;
+        um prefixo sem nenhum deles fica sem rota.
         """
-        rotas = dijkstra(ROTEADOR_IP, lsdb)
-        NetworkInterface.salvar_lsdb_rotas_arquivo(lsdb, rotas)
+        ips_vizinhos = {ip for ip, _ in vizinhos.values()}
         
-        rotas_validas = {}
-        for destino, proximo_salto in rotas.items():
-            for viz, (ip, _) in vizinhos.items():
-                if proximo_salto == ip:
-                    rotas_validas[destino] = proximo_salto
-                    break
+        def saltos_ativos(proximos_saltos: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+            return tuple(salto for salto in proximos_saltos or () if salto in ips_vizinhos) or None
         
-        rotas_adicionar, rotas_remover, rotas_replase = NetworkInterface.obter_rotas_existentes(rotas_validas)
-        for destino in rotas_remover.keys():
-            NetworkInterface.remover_interfaces(destino)
-                
-        for destino, proximo_salto in rotas_adicionar.items():
-            NetworkInterface.adicionar_interface(destino, proximo_salto)
-                
-        for destino, proximo_salto in rotas_replase.items():
-            NetworkInterface.replase_interface(destino, proximo_salto)
+        NetworkInterface.fib.atualizar({
+            rede: saltos_ativos(proximos_saltos) for rede, proximos_saltos in alteracoes.items()
+        })
+
+class ProtocoloLSA(asyncio.DatagramProtocol):
+    """Protocolo asyncio que entrega os datagramas recebidos ao roteador."""
+    
+    def __init__(self, router: "Router"):
+        """
+        Args:
+            router: Roteador que processa os datagramas
+        """
+        self.router = router
+    
+    def datagram_received(self, dados: bytes, addr: Tuple[str, int]) -> None:
+        """Processa um datagrama recebido na porta LSA."""
+        self.router.processar_datagrama(dados, addr)
+    
+    def error_received(self, exc: Exception) -> None:
+        """Registra erros de envio/recebimento reportados pelo socket."""
+        Logger.erro(f"Erro ao receber LSA: {exc}", "recebimento")
+
+# Contadores do roteador e a descrição de cada um no endpoint de métricas
+AJUDA_CONTADORES = {
+    "lsa_recebidas": "LSAs recebidas dos vizinhos",
+    "lsa_aceitas": "LSAs novas instaladas na LSDB",
+    "lsa_duplicadas": "LSAs recebidas que já eram conhecidas ou tinham idade máxima",
+    "lsa_inundadas": "Cópias de LSAs enfileiradas para os vizinhos na inundação",
+    "lsa_suprimidas": "Cópias não enviadas porque o vizinho já tinha a LSA",
+    "lsa_retransmitidas": "LSAs reenviadas por falta de confirmação",
+    "lsa_expiradas": "LSAs removidas da LSDB por idade máxima",
+    "acks_enviados": "Confirmações (LS-Ack) enviadas",
+    "acks_recebidos": "Confirmações (LS-Ack) recebidas",
+    "reparos_locais": "Rotas desviadas para alternativas livres de laços",
+    "vizinhos_ativados": "Vizinhos que passaram a responder aos HELLOs",
+    "vizinhos_inativados": "Vizinhos declarados inativos",
+}
 
 class Router:
     """Classe principal do roteador."""
@@ -349,110 +519,591 @@ class Router:
     def __init__(self):
         """Inicializa o roteador e suas dependências."""
         # Configurações obtidas de variáveis de ambiente
-        self.lsdb = {}  # Link State Database
         self.vizinhos = {}
-        self.lock = threading.Lock()
+        self.vizinhos_area: Dict[int, Dict[str, Tuple[str, int]]] = {}  # Vizinhos anunciados na última LSA de cada área
+        self.tabela_vizinhos = TabelaVizinhos(VIZINHOS, HELLO_INTERVALO, HELLO_MORTO,
+                                              CUSTO_ALFA, CUSTO_FAIXA, CUSTO_LIMIAR, CUSTO_ESPERA, AREAS)
+        self.prefixos = NetworkInterface.listar_prefixos()
+        areas_vizinhos = {vizinho.ip: vizinho.area for vizinho in self.tabela_vizinhos.vizinhos.values()}
+        # LSDB, SPF e rotas de cada área a que o roteador pertence
+        self.roteamento = RoteamentoAreas(ROTEADOR_IP, set(AREAS.values()) | {AREA_PADRAO}, LSA_IDADE_MAXIMA,
+                                          distribuir_prefixos(self.prefixos, areas_vizinhos, AREA_PADRAO))
+        self.sumarios: Dict[int, Dict[str, float]] = {}  # Sumários anunciados na última LSA de cada área
+        self.inundacao = Inundacao(LSA_RETRANSMISSAO)
+        self.filas = FilasSaida(LSA_MTU)
+        self.envio: Optional[EnvioEmLote] = None
+        self.esvaziamento_agendado = False
+        self.contadores = {chave: 0 for chave in AJUDA_CONTADORES}
+        self.seq = 0
+        self.ultima_originacao = float('-inf')
+        self.transporte: Optional[asyncio.DatagramTransport] = None
+        self.agendador: Optional[AgendadorSPF] = None
+        self.gravador: Optional[GravadorEstado] = None
+        self.rastreador = Rastreador(ROTEADOR_IP, f"rastros/rastro_{ROTEADOR_NAME}.jsonl", RASTREIO_ATIVO,
+                                     lambda e: Logger.erro(f"Erro ao gravar rastros: {e}"))
+        self.metricas = Metricas()
+        self.metricas.registrar(self.coletar_metricas)
+        self.duracao_spf = self.metricas.histograma("spf_duracao_segundos", "Duração do SPF e do cálculo das rotas por prefixo")
+        NetworkInterface.duracao_aplicacao = self.metricas.histograma(
+            "rotas_aplicacao_segundos", "Duração de cada lote de alterações de rotas aplicado ao kernel")
         
         Logger.log(f"Roteador inicializado com Nome: {ROTEADOR_IP}")
         Logger.log(f"Vizinhos configurados: {VIZINHOS}")
+        Logger.log(f"Prefixos conectados: {self.prefixos}")
+        if self.roteamento.borda:
+            Logger.log(f"Roteador de borda das áreas: {sorted(self.roteamento.areas)}")
     
-    def comparar_vizinhos(self, vizinhos_antigos: Dict[str, Tuple[str, int]], vizinhos_ativos: Dict[str, Tuple[str, int]]) -> bool:
+    async def executar_spf(self) -> None:
         """
-        Compara os vizinhos ativos com os antigos e retorna True se houver diferença.
+        Recalcula as rotas para todos os LSAs acumulados desde a última execução.
         
-        Args:
-            vizinhos_antigos: Dicionário de vizinhos antigos
-            vizinhos_ativos: Dicionário de vizinhos ativos
+        Chamado pelo agendador do SPF. O SPF roda no laço de eventos, que é o único
+        a alterar a LSDB; a programação das rotas roda em uma thread auxiliar para
+        não bloquear o recebimento de LSAs.
+        """
+        lote = self.rastreador.iniciar_spf()
+        try:
+            inicio = time.perf_counter()
+            alteracoes = self.roteamento.executar()
+            self.duracao_spf.observar(time.perf_counter() - inicio)
+            self.rastreador.marcar(lote, "spf_fim")
+            # As alternativas dependem só dos enlaces: LSAs que mudaram apenas prefixos não as afetam
+            calculadas = [area for area in self.roteamento.calculadas if area.topologia_alterada]
+            lsdb = {identificador: dict(area.lsdb.entradas) for identificador, area in self.roteamento.areas.items()}
+            vizinhos = dict(self.vizinhos)
+            rotas = self.roteamento.tabela()
             
+            # Um roteador de borda reorigina a LSA das áreas cujos sumários mudaram
+            alteradas = [area for area in self.roteamento.areas
+                         if self.roteamento.sumarios(area) != self.sumarios.get(area, {})]
+            if alteradas and self.vizinhos_area:
+                self.originar_lsa(alteradas)
+            
+            self.gravador.atualizar(f"lsdb/lsdb_{ROTEADOR_NAME}.json", lsdb)
+            self.gravador.atualizar(f"rotas/rotas_{ROTEADOR_NAME}.json", rotas)
+            await asyncio.to_thread(NetworkInterface.config_interface, vizinhos, rotas, alteracoes)
+            if alteracoes and self.rastreador.ativo:
+                # Só as LSAs que mudaram alguma rota contam como programação da FIB
+                origens = self.roteamento.origens_alteradas(alteracoes)
+                self.rastreador.marcar([chave for chave in lote if chave[0] in origens], "fib")
+            if LFA_ATIVO:
+                for area in calculadas:
+                    area.alternativas = await asyncio.to_thread(alternativas_sem_laco, ROTEADOR_IP, lsdb[area.identificador],
+                                                                dict(area.spf.tabela))
+        except Exception as e:
+            Logger.erro(f"Erro inesperado ao executar SPF: {e}")
+        finally:
+            self.rastreador.concluir(lote)
+    
+    def reparo_local(self, inativos: Set[str]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Calcula as rotas que devem deixar de usar vizinhos que acabaram de cair.
+        
+        Rotas ECMP apenas perdem o salto inativo; rotas com um único salto passam
+        para a alternativa livre de laços, calculada no último SPF da área da rota,
+        do roteador mais próximo que anuncia o prefixo.
+        
+        Args:
+            inativos: IPs dos vizinhos que ficaram inativos
+        
         Returns:
-            True se houver diferença, False caso contrário
+            Prefixo -> próximos saltos a instalar imediatamente
         """
-        if len(vizinhos_antigos) != len(vizinhos_ativos):
-            return True
+        ativos = {vizinho.ip for vizinho in self.tabela_vizinhos.vizinhos.values() if vizinho.ativo}
+        alteracoes = {}
+        for prefixo, saltos in self.roteamento.rotas.items():
+            if inativos.isdisjoint(saltos):
+                continue
+            restantes = tuple(salto for salto in saltos if salto in ativos)
+            if not restantes:
+                area = self.roteamento.areas[self.roteamento.area_rota[prefixo]]
+                alternativas = [area.alternativas.get(roteador) for roteador in area.rotas.melhores.get(prefixo, ())]
+                restantes = next(((alternativa,) for alternativa in alternativas if alternativa in ativos), ())
+            if restantes:
+                alteracoes[prefixo] = restantes
+        return alteracoes
+    
+    def originar_lsa(self, areas: Optional[Iterable[int]] = None) -> None:
+        """
+        Gera um novo LSA local em cada área, envia aos vizinhos ativos da área e agenda o SPF.
         
-        for viz, (ip, custo) in vizinhos_ativos.items():
-            if viz not in vizinhos_antigos or vizinhos_antigos[viz] != (ip, custo):
-                return True
+        Args:
+            areas: Áreas em que apenas os sumários mudaram; se omitido, todas as áreas são
+                reoriginadas com os custos atuais dos vizinhos
+        """
+        agora = time.monotonic()
+        originado = time.time()
+        if areas is None:
+            self.vizinhos_area = self.tabela_vizinhos.anunciar(agora)
+            self.vizinhos = {viz: enlace for vizinhos in self.vizinhos_area.values() for viz, enlace in vizinhos.items()}
+            self.ultima_originacao = agora
+            areas = self.roteamento.areas
+        self.seq += 1
         
-        return False
+        for identificador in areas:
+            area = self.roteamento.areas[identificador]
+            vizinhos_ativos = self.vizinhos_area.get(identificador, {})
+            self.sumarios[identificador] = self.roteamento.sumarios(identificador)
+            lsa = LSAHandler.criar_pacote_lsa(ROTEADOR_IP, self.seq, vizinhos_ativos,
+                                              self.roteamento.prefixos.get(identificador, []), self.sumarios[identificador])
+            
+            for viz, (ip, custo) in vizinhos_ativos.items():
+                self.enfileirar_lsas(ip, [lsa])
+                self.inundacao.enfileirar(ip, lsa, agora)
+            self.contadores["lsa_inundadas"] += len(vizinhos_ativos)
             
+            area.lsdb.instalar(lsa, agora)
+            area.origens_pendentes.add(ROTEADOR_IP)
+        self.rastreador.aceitar((ROTEADOR_IP, self.seq), {"originado": originado})
+        self.rastreador.marcar([(ROTEADOR_IP, self.seq)], "inundado")
+        self.agendador.agendar()
+    
+    def superar_lsa_propria(self, seq: int) -> None:
+        """
+        Trata uma cópia da LSA local mais recente que a atual, que sobrou de antes de um reinício.
         
-    def thread_enviar_lsa(self) -> None:
-        """Thread para enviar LSAs periodicamente."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        seq = 0
+        A cópia não é instalada: a sequência local passa a valer a recebida e uma nova LSA
+        é originada em seguida, substituindo a cópia antiga em toda a rede.
+        
+        Args:
+            seq: Sequência da cópia recebida
+        """
+        if seq < self.seq:
+            return
+        Logger.log(f"LSA própria com sequência {seq} recebida (local {self.seq}); reoriginando", "aviso")
+        self.seq = seq
+        self.originar_lsa()
+    
+    def enfileirar_lsas(self, ip: str, lsas: List[Dict[str, Any]]) -> None:
+        """
+        Coloca LSAs na fila de saída de um vizinho e agenda o esvaziamento das filas.
         
+        Args:
+            ip: IP do vizinho
+            lsas: LSAs a enviar
+        """
+        for lsa in lsas:
+            self.filas.enfileirar(ip, lsa)
+        if lsas and not self.esvaziamento_agendado:
+            self.esvaziamento_agendado = True
+            asyncio.get_running_loop().call_later(LSA_RITMO, self.esvaziar_filas)
+    
+    def esvaziar_filas(self) -> None:
+        """Empacota as LSAs de cada fila de saída até a MTU do caminho e envia todos os datagramas em lote."""
+        self.esvaziamento_agendado = False
+        mensagens = []
+        enviadas = []
+        for ip, lsas in self.filas.retirar().items():
+            # Uma cópia pode ter chegado do próprio vizinho enquanto a LSA aguardava na fila
+            enviar = [lsa for lsa in lsas if not self.inundacao.conhece(ip, lsa["id"], lsa["seq"])]
+            self.contadores["lsa_suprimidas"] += len(lsas) - len(enviar)
+            lsas = enviar
+            enviadas.extend((lsa["id"], lsa["seq"]) for lsa in lsas)
+            for mensagem in LSAHandler.serializar_varias(lsas, self.filas.tamanho_maximo(ip), self.area_vizinho(ip)):
+                mensagens.append((mensagem, (ip, PORTA_LSA)))
+        try:
+            self.envio.enviar(mensagens)
+            self.rastreador.marcar(enviadas, "enviado")
+        except Exception as e:
+            Logger.erro(f"Erro ao enviar LSAs: {e}")
+    
+    async def tarefa_hello(self) -> None:
+        """Tarefa que envia HELLOs aos vizinhos e origina um LSA quando algum fica inativo ou muda de custo."""
         while True:
-            vizinhos_ativos = NetworkUtils.realizar_pings(VIZINHOS)
-            if self.comparar_vizinhos(self.vizinhos, vizinhos_ativos):
-                seq += 1
-                lsa = LSAHandler.criar_pacote_lsa(ROTEADOR_IP, seq, vizinhos_ativos) 
-                mensagem = json.dumps(lsa).encode()
+            agora = time.monotonic()
+            inativos = self.tabela_vizinhos.verificar_inativos(agora)
+            for vizinho in inativos:
+                Logger.log(f"Vizinho inativo: {vizinho.nome} ({vizinho.ip})")
+                self.contadores["vizinhos_inativados"] += 1
+                self.inundacao.descartar_vizinho(vizinho.ip)
+            if inativos and LFA_ATIVO:
+                alteracoes = self.reparo_local({vizinho.ip for vizinho in inativos})
+                if alteracoes:
+                    Logger.log(f"Reparo local: {len(alteracoes)} rotas desviadas antes do SPF")
+                    self.contadores["reparos_locais"] += len(alteracoes)
+                    await asyncio.to_thread(NetworkInterface.fib.atualizar, alteracoes)
+            if inativos or self.tabela_vizinhos.custos_alterados(agora):
+                self.originar_lsa()
+            
+            seq = self.tabela_vizinhos.proximo_seq()
+            self.envio.enviar([
+                (protocolo.codificar_hello(protocolo.TIPO_HELLO, ROTEADOR_IP, seq, agora, vizinho.area), (vizinho.ip, PORTA_LSA))
+                for vizinho in self.tabela_vizinhos.vizinhos.values()
+            ])
+            await asyncio.sleep(HELLO_INTERVALO)
+    
+    def processar_hello(self, tipo: int, dados: bytes, addr: Tuple[str, int]) -> None:
+        """
+        Responde a um HELLO ou registra a resposta de um vizinho.
+        
+        Args:
+            tipo: TIPO_HELLO ou TIPO_HELLO_RESPOSTA
+            dados: Datagrama recebido
+            addr: Endereço (ip, porta) de quem enviou
+        """
+        remetente, seq, carimbo = protocolo.decodificar_hello(dados)
+        # Um enlace configurado com áreas diferentes nos dois lados não forma adjacência
+        area = self.area_do_pacote(dados, self.tabela_vizinhos.vizinhos.get(remetente))
+        if area is None:
+            return
+        if tipo == protocolo.TIPO_HELLO:
+            self.tabela_vizinhos.associar(addr[0], remetente)
+            resposta = protocolo.codificar_hello(protocolo.TIPO_HELLO_RESPOSTA, ROTEADOR_IP, seq, carimbo, area.identificador)
+            self.transporte.sendto(resposta, addr)
+        elif self.tabela_vizinhos.registrar_resposta(remetente, addr[0], carimbo, time.monotonic()):
+            Logger.log(f"Vizinho ativo: {remetente}")
+            self.contadores["vizinhos_ativados"] += 1
+            self.originar_lsa()
+            self.enviar_dbd(self.tabela_vizinhos.vizinhos[remetente], time.monotonic())
+    
+    def area_vizinho(self, endereco: str) -> int:
+        """
+        Retorna a área do enlace com o vizinho de um endereço.
+        
+        Args:
+            endereco: IP (identificador) ou IP de interface do vizinho
+        
+        Returns:
+            Área do enlace, ou a área padrão se o endereço não for de um vizinho configurado
+        """
+        vizinho = self.tabela_vizinhos.vizinhos.get(self.tabela_vizinhos.identificar(endereco))
+        return AREA_PADRAO if vizinho is None else vizinho.area
+    
+    def area_do_pacote(self, dados: bytes, vizinho: Optional[Vizinho]) -> Optional[Area]:
+        """
+        Identifica a área de um pacote recebido.
+        
+        A área é a do enlace com o vizinho que enviou o pacote; para remetentes
+        desconhecidos vale a área do cabeçalho binário (ou a área padrão, no JSON).
+        
+        Args:
+            dados: Datagrama recebido
+            vizinho: Vizinho que enviou o datagrama, se conhecido
+        
+        Returns:
+            Área do pacote, ou None se o cabeçalho indicar outra área ou uma área da qual o roteador não participa
+        """
+        informada = protocolo.area_pacote(dados) if protocolo.eh_binario(dados) else None
+        if vizinho is None:
+            return self.roteamento.areas.get(AREA_PADRAO if informada is None else informada)
+        if informada is not None and informada != vizinho.area:
+            return None
+        return self.roteamento.areas.get(vizinho.area)
+    
+    def enviar_dbd(self, vizinho: Vizinho, agora: float) -> None:
+        """
+        Envia ao vizinho o resumo (origem, sequência) de todas as LSAs da LSDB.
+        
+        Args:
+            vizinho: Vizinho cuja adjacência está em troca
+            agora: Instante atual (time.monotonic)
+        """
+        lsdb = self.roteamento.areas[vizinho.area].lsdb
+        for pacote in protocolo.codificar_resumos(protocolo.TIPO_DBD, list(lsdb.seqs.items()), vizinho.area):
+            self.transporte.sendto(pacote, (vizinho.ip, PORTA_LSA))
+        vizinho.ultima_sincronizacao = agora
+    
+    def processar_dbd(self, dados: bytes, addr: Tuple[str, int]) -> None:
+        """
+        Compara o resumo da LSDB do vizinho com a local e pede as LSAs ausentes ou mais recentes.
+        
+        Args:
+            dados: Datagrama DBD recebido
+            addr: Endereço (ip, porta) de quem enviou
+        """
+        vizinho = self.tabela_vizinhos.vizinhos.get(self.tabela_vizinhos.identificar(addr[0]))
+        area = self.area_do_pacote(dados, vizinho)
+        if vizinho is None or area is None:
+            return
+        resumo = protocolo.decodificar_resumos(dados)
+        self.inundacao.confirmar(vizinho.ip, resumo)
+        faltando = [(origem, seq) for origem, seq in resumo if area.lsdb.eh_nova(origem, seq)]
+        proprias = [seq for origem, seq in faltando if origem == ROTEADOR_IP]
+        if proprias:
+            faltando = [(origem, seq) for origem, seq in faltando if origem != ROTEADOR_IP]
+            self.superar_lsa_propria(max(proprias))
+        vizinho.pedidos.update(faltando)
+        # Um vizinho reiniciado descreve a própria LSA com sequência menor que a conhecida:
+        # a cópia mais recente é devolvida para que ele a supere
+        for origem, seq in resumo:
+            if origem == vizinho.ip and seq < area.lsdb.seqs.get(origem, -1):
+                self.inundacao.esquecer(vizinho.ip, [origem])
+                self.enfileirar_lsas(vizinho.ip, [dict(area.lsdb.entradas[origem],
+                                                       idade=area.lsdb.idade(origem, time.monotonic()))])
+        # Mesmo vazio, o LSR confirma ao vizinho o recebimento do DBD
+        for pacote in protocolo.codificar_resumos(protocolo.TIPO_LSR, faltando, area.identificador):
+            self.transporte.sendto(pacote, (vizinho.ip, PORTA_LSA))
+    
+    def processar_lsr(self, dados: bytes, addr: Tuple[str, int]) -> None:
+        """
+        Responde a um pedido de LSAs com as cópias da LSDB, agrupadas no menor número de LSUs.
+        
+        Args:
+            dados: Datagrama LSR recebido
+            addr: Endereço (ip, porta) de quem enviou
+        """
+        vizinho = self.tabela_vizinhos.vizinhos.get(self.tabela_vizinhos.identificar(addr[0]))
+        area = self.area_do_pacote(dados, vizinho)
+        if vizinho is None or area is None:
+            return
+        vizinho.dbd_confirmado = True
+        
+        agora = time.monotonic()
+        pedidas = [origem for origem, _ in protocolo.decodificar_resumos(dados)]
+        self.inundacao.esquecer(vizinho.ip, pedidas)
+        lsas = []
+        for origem in pedidas:
+            if origem in area.lsdb.entradas:
+                lsas.append(dict(area.lsdb.entradas[origem], idade=area.lsdb.idade(origem, agora)))
+        self.enfileirar_lsas(vizinho.ip, lsas)
+        if vizinho.ativo:
+            for lsa in lsas:
+                self.inundacao.enfileirar(vizinho.ip, lsa, agora)
+    
+    def manter_sincronizacao(self, agora: float) -> None:
+        """
+        Conclui as adjacências sincronizadas e reenvia DBDs e LSRs sem resposta.
+        
+        Args:
+            agora: Instante atual (time.monotonic)
+        """
+        for vizinho in self.tabela_vizinhos.vizinhos.values():
+            if vizinho.estado != ADJ_TROCA:
+                continue
+            lsdb = self.roteamento.areas[vizinho.area].lsdb
+            vizinho.pedidos = {origem: seq for origem, seq in vizinho.pedidos.items() if lsdb.eh_nova(origem, seq)}
+            if vizinho.dbd_confirmado and not vizinho.pedidos:
+                vizinho.estado = ADJ_COMPLETA
+                Logger.log(f"Adjacência completa com {vizinho.nome} ({vizinho.ip})")
+                continue
+            
+            if agora - vizinho.ultima_sincronizacao >= LSA_RETRANSMISSAO:
+                if not vizinho.dbd_confirmado:
+                    self.enviar_dbd(vizinho, agora)
+                if vizinho.pedidos:
+                    for pacote in protocolo.codificar_resumos(protocolo.TIPO_LSR, list(vizinho.pedidos.items()), vizinho.area):
+                        self.transporte.sendto(pacote, (vizinho.ip, PORTA_LSA))
+                    vizinho.ultima_sincronizacao = agora
+                
+    def processar_ack(self, dados: bytes, addr: Tuple[str, int]) -> None:
+        """
+        Remove da lista de retransmissão do vizinho as LSAs confirmadas.
+        
+        Args:
+            dados: Datagrama LS-Ack recebido
+            addr: Endereço (ip, porta) de quem enviou
+        """
+        chaves = protocolo.decodificar_resumos(dados)
+        self.contadores["acks_recebidos"] += len(chaves)
+        self.inundacao.confirmar(self.tabela_vizinhos.identificar(addr[0]) or addr[0], chaves)
+    
+    def processar_datagrama(self, dados: bytes, addr: Tuple[str, int]) -> None:
+        """
+        Processa um datagrama LSA recebido: confirma, descarta duplicatas, inunda e atualiza a LSDB.
+        
+        Args:
+            dados: Datagrama recebido
+            addr: Endereço (ip, porta) de quem enviou
+        """
+        recebido = time.time() if self.rastreador.ativo else 0.0
+        try:
+            tipo = protocolo.tipo_pacote(dados)
+            if tipo in (protocolo.TIPO_HELLO, protocolo.TIPO_HELLO_RESPOSTA):
+                self.processar_hello(tipo, dados, addr)
+                return
+            if tipo == protocolo.TIPO_LSACK:
+                self.processar_ack(dados, addr)
+                return
+            if tipo == protocolo.TIPO_DBD:
+                self.processar_dbd(dados, addr)
+                return
+            if tipo == protocolo.TIPO_LSR:
+                self.processar_lsr(dados, addr)
+                return
+            remetente = self.tabela_vizinhos.identificar(addr[0]) or addr[0]
+            area = self.area_do_pacote(dados, self.tabela_vizinhos.vizinhos.get(remetente))
+            if area is None:
+                Logger.log(f"LSU de {remetente} descartada: área diferente da do enlace", "aviso", "area")
+                return
+            lsdb = area.lsdb
+            
+            # Caminho rápido: descarta cópias já conhecidas lendo só origem e sequência
+            chaves = protocolo.chaves_lsu(dados)
+            if chaves is not None:
+                self.contadores["lsa_recebidas"] += len(chaves)
+                if not any(lsdb.eh_nova(origem, seq) for origem, seq in chaves):
+                    self.contadores["lsa_duplicadas"] += len(chaves)
+                    # Uma cópia repetida indica que o vizinho não recebeu a confirmação anterior
+                    self.inundacao.confirmar(remetente, chaves)
+                    self.inundacao.agendar_ack(addr[0], chaves)
+                    return
+            
+            lsas = LSAHandler.desserializar(dados)
+            decodificado = time.time() if self.rastreador.ativo else 0.0
+            # Cópias com idade máxima são descartadas: cada roteador expira as LSAs por conta própria
+            novas = [lsa for lsa in lsas if lsdb.eh_nova(lsa["id"], lsa["seq"])
+                     and lsa.get("idade", 0) < LSA_IDADE_MAXIMA]
+            # Cópias da própria LSA mais recentes que a local não são instaladas nem inundadas
+            proprias = [lsa["seq"] for lsa in novas if lsa["id"] == ROTEADOR_IP]
+            if proprias:
+                novas = [lsa for lsa in novas if lsa["id"] != ROTEADOR_IP]
+            if chaves is None:
+                chaves = [(lsa["id"], lsa["seq"]) for lsa in lsas]
+                self.contadores["lsa_recebidas"] += len(lsas)
+            # O vizinho que enviou uma cópia já a possui: serve de confirmação implícita
+            self.inundacao.confirmar(remetente, chaves)
+            self.inundacao.agendar_ack(addr[0], chaves)
+            self.contadores["lsa_duplicadas"] += len(lsas) - len(novas)
+            self.contadores["lsa_aceitas"] += len(novas)
+            if proprias:
+                self.superar_lsa_propria(max(proprias))
+
+            if novas:
+                if self.rastreador.ativo:
+                    for lsa in novas:
+                        self.rastreador.aceitar((lsa["id"], lsa["seq"]), {"recebido": recebido, "decodificado": decodificado})
                 
-                for viz, (ip, custo) in vizinhos_ativos.items():
-                    LSAHandler.enviar_lsa_para_vizinho(sock, mensagem, viz, ip)
-  
-                with self.lock:
-                    self.lsdb[ROTEADOR_IP] = lsa
-                    self.vizinhos = vizinhos_ativos
-                    NetworkInterface.config_interface(self.lsdb, self.vizinhos)
+                # Inunda apenas adjacências ativas da mesma área, exceto o vizinho que enviou e os que já têm a cópia
+                agora = time.monotonic()
+                for vizinho in self.tabela_vizinhos.vizinhos.values():
+                    if not vizinho.ativo or vizinho.area != area.identificador or vizinho.ip == remetente:
+                        continue
+                    enviar = [lsa for lsa in novas if not self.inundacao.conhece(vizinho.ip, lsa["id"], lsa["seq"])]
+                    self.contadores["lsa_suprimidas"] += len(novas) - len(enviar)
+                    self.contadores["lsa_inundadas"] += len(enviar)
+                    self.enfileirar_lsas(vizinho.ip, enviar)
+                    for lsa in enviar:
+                        self.inundacao.enfileirar(vizinho.ip, lsa, agora)
                 
-    def thread_receber_lsa(self) -> None:
-        """Thread para receber LSAs de outros roteadores."""
+                for lsa in novas:
+                    lsdb.instalar(lsa, agora)
+                    area.origens_pendentes.add(lsa["id"])
+                self.rastreador.marcar([(lsa["id"], lsa["seq"]) for lsa in novas], "inundado")
+                self.agendador.agendar()
+
+        except (json.JSONDecodeError, protocolo.ErroPacote):
+            Logger.erro("Erro ao decodificar LSA recebido.", "recebimento")
+        except Exception as e:
+            Logger.erro(f"Erro inesperado ao receber LSA: {e}", "recebimento")
+        
+    async def tarefa_inundacao(self) -> None:
+        """Tarefa que envia as confirmações acumuladas, reenvia as LSAs não confirmadas e acompanha a sincronização das adjacências."""
+        while True:
+            await asyncio.sleep(LSA_ACK_ATRASO)
+            
+            acks = []
+            for endereco, chaves in self.inundacao.retirar_acks().items():
+                for pacote in protocolo.codificar_resumos(protocolo.TIPO_LSACK, chaves, self.area_vizinho(endereco)):
+                    acks.append((pacote, (endereco, PORTA_LSA)))
+                self.contadores["acks_enviados"] += len(chaves)
+            self.envio.enviar(acks)
+            
+            agora = time.monotonic()
+            for ip, lsas in self.inundacao.vencidas(agora).items():
+                self.enfileirar_lsas(ip, lsas)
+                self.contadores["lsa_retransmitidas"] += len(lsas)
+            self.manter_sincronizacao(agora)
+    
+    async def tarefa_envelhecimento(self) -> None:
+        """Tarefa que reorigina periodicamente a LSA local e remove da LSDB as LSAs com idade máxima."""
+        while True:
+            agora = time.monotonic()
+            if agora - self.ultima_originacao >= LSA_REFRESH:
+                self.originar_lsa()
+            
+            for area in self.roteamento.areas.values():
+                expiradas = area.lsdb.expirar(agora)
+                if expiradas:
+                    Logger.log(f"LSAs expiradas (MaxAge) na área {area.identificador}: {expiradas}")
+                    self.contadores["lsa_expiradas"] += len(expiradas)
+                    vizinhos_area = [ip for ip, vizinho in self.tabela_vizinhos.vizinhos.items() if vizinho.area == area.identificador]
+                    for origem in expiradas:
+                        self.inundacao.descartar_origem(origem, vizinhos_area)
+                    area.origens_pendentes.update(expiradas)
+                    self.agendador.agendar()
+            await asyncio.sleep(min(area.lsdb.roda.resolucao for area in self.roteamento.areas.values()))
+    
+    def coletar_metricas(self) -> Iterator[Amostra]:
+        """Lê os contadores e medidores do roteador a cada consulta ao endpoint de métricas."""
+        for chave, valor in self.contadores.items():
+            yield f"{chave}_total", "counter", AJUDA_CONTADORES[chave], {}, valor
+        if self.agendador is not None:
+            yield "spf_execucoes_total", "counter", "Execuções do SPF", {}, self.agendador.execucoes
+            yield "spf_pedidos_total", "counter", "Pedidos de recálculo do SPF", {}, self.agendador.pedidos
+        if self.envio is not None:
+            yield "envio_chamadas_total", "counter", "Chamadas ao sistema para enviar datagramas", {}, self.envio.chamadas
+            yield "envio_datagramas_total", "counter", "Datagramas enviados", {}, self.envio.datagramas
+        if self.gravador is not None:
+            yield "gravacoes_total", "counter", "Arquivos JSON da LSDB e das rotas gravados", {}, self.gravador.gravacoes
+        for operacao, total in NetworkInterface.operacoes.items():
+            yield "rotas_operacoes_total", "counter", "Operações de rota aplicadas ao kernel", {"operacao": operacao}, total
+        fib = NetworkInterface.fib
+        if fib is not None:
+            yield "fib_rotas", "gauge", "Rotas instaladas pelo roteador", {}, len(fib.rotas)
+            yield "fib_reconciliacoes_total", "counter", "Reconciliações da FIB sombra com o kernel", {}, fib.reconciliacoes
+            yield "fib_lock_aquisicoes_total", "counter", "Aquisições do lock da FIB", {}, fib.aquisicoes
+            yield "fib_lock_espera_segundos_total", "counter", "Tempo total de espera pelo lock da FIB", {}, fib.espera_lock
+        ativos = sum(1 for vizinho in self.tabela_vizinhos.vizinhos.values() if vizinho.ativo)
+        yield "vizinhos_ativos", "gauge", "Vizinhos que respondem aos HELLOs", {}, ativos
+        yield "inundacao_pendentes", "gauge", "LSAs aguardando confirmação dos vizinhos", {}, self.inundacao.pendentes()
+        for identificador, area in self.roteamento.areas.items():
+            yield "lsdb_lsas", "gauge", "LSAs na LSDB de cada área", {"area": str(identificador)}, len(area.lsdb.entradas)
+    
+    async def tarefa_reconciliar_fib(self) -> None:
+        """Tarefa que reconcilia periodicamente a FIB sombra com o kernel."""
+        while True:
+            if await asyncio.to_thread(NetworkInterface.aguardar_alteracao_rotas, FIB_RECONCILIACAO):
+                Logger.log("Alteração externa na tabela de rotas detectada, reconciliando FIB")
+            try:
+                await asyncio.to_thread(NetworkInterface.fib.reconciliar)
+            except Exception as e:
+                Logger.erro(f"Erro ao reconciliar FIB: {e}")
+    
+    async def executar(self) -> None:
+        """Executa o roteador: socket LSA, protocolo Hello, SPF, gravação do estado, métricas e reconciliação da FIB."""
+        loop = asyncio.get_running_loop()
+        
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Isso permite que o socket seja reutilizado
-        
         try:
             sock.bind(("0.0.0.0", PORTA_LSA))
         except Exception as e:
-            Logger.log(f"Erro ao vincular socket: {e}")
+            Logger.erro(f"Erro ao vincular socket: {e}")
             return
-            
-        while True:
+        self.transporte, _ = await loop.create_datagram_endpoint(lambda: ProtocoloLSA(self), sock=sock)
+        self.envio = EnvioEmLote(self.transporte)
+        
+        self.agendador = AgendadorSPF(self.executar_spf, SPF_ATRASO_INICIAL, SPF_ESPERA, SPF_ESPERA_MAXIMA)
+        if METRICAS_PORTA:
             try:
-                dados, addr = sock.recvfrom(4096)
-                
-                lsa = json.loads(dados.decode())
-                origem = lsa["id"]
-
-                if origem not in self.lsdb or lsa["seq"] > self.lsdb[origem]["seq"]:
-                    for viz, (ip, custo) in VIZINHOS.items():
-                        if ip != addr[0]:
-                            sock.sendto(dados, (ip, PORTA_LSA))
-                    
-                    with self.lock:
-                        self.lsdb[origem] = lsa
-                        NetworkInterface.config_interface(self.lsdb, self.vizinhos)
-
-            except socket.error as e:
-                Logger.log(f"Erro ao receber LSA: {e}")
-            except json.JSONDecodeError:
-                Logger.log("Erro ao decodificar LSA recebido.")
-            except Exception as e:
-                Logger.log(f"Erro inesperado ao receber LSA: {e}")
+                await self.metricas.servir(METRICAS_PORTA, METRICAS_ENDERECO)
+            except OSError as e:
+                Logger.erro(f"Erro ao iniciar o endpoint de métricas: {e}")
         
-    def iniciar(self) -> None:
-        """Inicia as threads do roteador."""
+        self.gravador = GravadorEstado(GRAVACAO_INTERVALO, lambda caminho, e: Logger.erro(f"Erro ao salvar {caminho}: {e}"))
+        await asyncio.gather(
+            self.agendador.laco(),
+            self.gravador.laco(),
+            self.rastreador.laco(GRAVACAO_INTERVALO),
+            self.tarefa_hello(),
+            self.tarefa_envelhecimento(),
+            self.tarefa_inundacao(),
+            self.tarefa_reconciliar_fib(),
+        )
         
-        while True:
-            with open("start.txt", 'r') as file:
-                if file.read().strip() == "start":
-                    break
-        
-        threads = [
-            threading.Thread(target=self.thread_enviar_lsa, daemon=True, name="enviar_lsa"),
-            threading.Thread(target=self.thread_receber_lsa, daemon=True, name="receber_lsa"),
-        ]
-        
-        for thread in threads:
-            thread.start()
-        threading.Event().wait()
+    def iniciar(self) -> None:
+        """Aguarda o sinal de início (start.txt ou SIGUSR1) e executa o laço de eventos do roteador."""
+        aguardar_inicio("start.txt", "start", PARTIDA_INTERVALO)
+        asyncio.run(self.executar())
 
 if __name__ == "__main__":
     os.makedirs("lsdb", exist_ok=True)
     os.makedirs("rotas", exist_ok=True)
+    if RASTREIO_ATIVO:
+        os.makedirs("rastros", exist_ok=True)
     
     # Inicializa e executa o roteador
+    Logger.configurar(ROTEADOR_IP, LOG_NIVEL, LOG_FORMATO, LOG_TAXA, LOG_RAJADA)
+    NetworkInterface.inicializar()
     router = Router()
     router.iniciar()
@@ -0,0 +1,173 @@
+"""
+Análise dos Rastros de Propagação das LSAs
+------------------------------------------
+Este script combina os rastros gravados pelos roteadores iniciados com
+`rastreio=1` (router/rastros/rastro_<nome>.jsonl) e calcula, para cada
+roteador de origem, a latência de propagação de suas LSAs: do instante em
+que a LSA foi originada até ela ser recebida e até as rotas dela decorrentes
+estarem programadas em cada roteador. Também exibe o tempo médio gasto em
+cada etapa, para apontar onde está o gargalo.
+
+Uso: python3 scripts_test/analisar_rastros.py [diretório dos rastros]
+"""
+
+import bisect
+import glob
+import json
+import os
+import sys
+
+# Cores para output
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    BOLD = '\033[1m'
+    NC = '\033[0m'  # No Color
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "router", "rastros")
+
+# Etapas consecutivas cujo intervalo é exibido: (nome, etapa inicial, etapa final)
+INTERVALOS = [
+    ("decodificação", "recebido", "decodificado"),
+    ("aceitação", "decodificado", "aceito"),
+    ("inundação", "aceito", "inundado"),
+    ("envio", "inundado", "enviado"),
+    ("espera do SPF", "aceito", "spf_inicio"),
+    ("SPF", "spf_inicio", "spf_fim"),
+    ("programação da FIB", "spf_fim", "fib"),
+]
+
+def ler_rastros(diretorio):
+    """
+    Lê os registros de todos os roteadores.
+
+    Args:
+        diretorio (str): Diretório com os arquivos rastro_*.jsonl
+
+    Returns:
+        list: Registros {"roteador", "origem", "seq", "etapas"}
+    """
+    registros = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, "rastro_*.jsonl"))):
+        with open(caminho) as file:
+            for linha in file:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    registros.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    # Última linha pode estar incompleta se o roteador ainda estiver gravando
+                    continue
+    return registros
+
+def percentil(valores, fracao):
+    """
+    Calcula um percentil por aproximação do vizinho mais próximo.
+
+    Args:
+        valores (list): Valores ordenados
+        fracao (float): Percentil desejado entre 0 e 1
+
+    Returns:
+        float: Valor do percentil
+    """
+    indice = min(len(valores) - 1, max(0, round(fracao * (len(valores) - 1))))
+    return valores[indice]
+
+def resumir(valores):
+    """Formata mediana, p95 e máximo (em ms) de uma lista de durações em segundos."""
+    if not valores:
+        return f"{'-':>9} {'-':>9} {'-':>9}"
+    valores = sorted(valores)
+    return " ".join(f"{v * 1000:9.2f}" for v in (percentil(valores, 0.5), percentil(valores, 0.95), valores[-1]))
+
+def propagacao_por_origem(registros):
+    """
+    Agrupa as latências de ponta a ponta por roteador de origem.
+
+    As sequências recomeçam quando um roteador reinicia e os rastros acumulam
+    várias execuções, então cada registro é associado à originação mais
+    recente da mesma LSA que não seja posterior à sua primeira etapa.
+    Latências negativas (relógios fora de sincronia) são descartadas.
+
+    Args:
+        registros (list): Registros de todos os roteadores
+
+    Returns:
+        dict: origem -> (LSAs rastreadas, latências até o recebimento, latências até a FIB)
+    """
+    originadas = {}
+    for registro in registros:
+        if registro["roteador"] == registro["origem"] and "originado" in registro["etapas"]:
+            originadas.setdefault((registro["origem"], registro["seq"]), []).append(
+                (registro["etapas"]["originado"], registro.get("execucao")))
+    for originacoes in originadas.values():
+        originacoes.sort(key=lambda originacao: originacao[0])
+
+    resultado = {}
+    for registro in registros:
+        chave = (registro["origem"], registro["seq"])
+        etapas = registro["etapas"]
+        if registro["roteador"] == registro["origem"] or chave not in originadas or not etapas:
+            continue
+        originacoes = originadas[chave]
+        posicao = bisect.bisect_right([instante for instante, _ in originacoes], min(etapas.values()))
+        if posicao == 0:
+            continue
+        inicio, execucao = originacoes[posicao - 1]
+        lsas, recebimento, fib = resultado.setdefault(registro["origem"], (set(), [], []))
+        lsas.add((execucao, registro["seq"]))
+        for etapa, latencias in (("recebido", recebimento), ("fib", fib)):
+            if etapa in etapas and etapas[etapa] >= inicio:
+                latencias.append(etapas[etapa] - inicio)
+    return resultado
+
+def duracao_das_etapas(registros):
+    """
+    Calcula as durações de cada etapa em todos os registros.
+
+    Args:
+        registros (list): Registros de todos os roteadores
+
+    Returns:
+        dict: nome do intervalo -> lista de durações (s)
+    """
+    duracoes = {nome: [] for nome, _, _ in INTERVALOS}
+    for registro in registros:
+        etapas = registro["etapas"]
+        for nome, inicio, fim in INTERVALOS:
+            if inicio in etapas and fim in etapas and etapas[fim] >= etapas[inicio]:
+                duracoes[nome].append(etapas[fim] - etapas[inicio])
+    return duracoes
+
+def main():
+    """
+    Função principal que lê os rastros, calcula a propagação por origem
+    e exibe a duração de cada etapa.
+    """
+    diretorio = sys.argv[1] if len(sys.argv) > 1 else DIRETORIO_PADRAO
+    registros = ler_rastros(diretorio)
+    if not registros:
+        print(f"{Colors.RED}Erro: Nenhum rastro encontrado em {diretorio}. "
+              f"Inicie os roteadores com 'rastreio=1'.{Colors.NC}")
+        sys.exit(1)
+
+    roteadores = {registro["roteador"] for registro in registros}
+    print(f"{Colors.BLUE}{len(registros)} registros de {len(roteadores)} roteadores.{Colors.NC}", end='\n\n')
+
+    print(f"{Colors.BOLD}{Colors.CYAN}=== Propagação por origem (ms: mediana p95 máximo) ==={Colors.NC}")
+    print(f"{Colors.YELLOW}{'Origem':<16} {'LSAs':>5}   {'Até o recebimento':^29}   {'Até a FIB':^29}{Colors.NC}")
+    for origem, (lsas, recebimento, fib) in sorted(propagacao_por_origem(registros).items()):
+        print(f"{origem:<16} {len(lsas):>5}   {resumir(recebimento)}   {resumir(fib)}")
+    print()
+
+    print(f"{Colors.BOLD}{Colors.CYAN}=== Duração das etapas (ms: mediana p95 máximo) ==={Colors.NC}")
+    for nome, duracoes in duracao_das_etapas(registros).items():
+        print(f"{nome:<20} {len(duracoes):>6}   {resumir(duracoes)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Benchmark do SPF
+----------------
+Este script mede o desempenho dos motores de SPF do roteador sem Docker:
+gera LSDBs sintéticas no mesmo formato usado pelo roteador (anel, linha,
+grade, aleatória Erdős–Rényi, Barabási–Albert e fat-tree) de 10 a 10.000
+roteadores, cronometra cada motor (`dijkstra`, carga completa e atualização
+do `SPFIncremental`, alternativas LFA) e mede o pico de memória alocada.
+
+Os resultados são acrescentados a `dados_benchmark/spf.csv`, na raiz do
+repositório (fora do controle de versão), uma linha por
+(topologia, roteadores, motor), para comparação entre versões. Com
+`--comparar <csv>` a execução é comparada com a última medição de cada
+combinação no arquivo indicado e o script termina com erro se algum motor
+ficar mais lento que a tolerância, o que permite barrar regressões antes
+de gerar as imagens.
+
+Uso: python3 scripts_test/benchmark_spf.py [--topologias anel,grade] [--tamanhos 10,100,1000]
+                                           [--comparar dados_benchmark/spf.csv] [--tolerancia 0.2]
+"""
+
+import argparse
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "router"))
+
+from dycastra import SPFIncremental, alternativas_sem_laco, dijkstra  # noqa: E402
+
+# Cores para output
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    BOLD = '\033[1m'
+    NC = '\033[0m'  # No Color
+
+ARQUIVO_PADRAO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dados_benchmark", "spf.csv"))
+CABECALHO = "data,versao,python,topologia,roteadores,enlaces,motor,repeticoes,mediana_s,minimo_s,ops_s,memoria_pico_kib"
+TAMANHOS_PADRAO = [10, 100, 1000, 10000]
+# Quantidade máxima de enlaces da árvore testados até achar um cuja retirada mude rotas
+TENTATIVAS_ENLACE = 64
+# Grau médio das topologias aleatórias (Erdős–Rényi) e enlaces por novo roteador (Barabási–Albert)
+GRAU_MEDIO_ALEATORIO = 4
+ENLACES_BARABASI = 2
+
+def ip_roteador(i):
+    """
+    Gera o IP (identificador) do i-ésimo roteador.
+
+    Args:
+        i (int): Índice do roteador
+
+    Returns:
+        str: Endereço IP no formato usado como chave da LSDB
+    """
+    i += 1
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+def montar_lsdb(n, enlaces, custo_unitario, semente):
+    """
+    Monta a LSDB no formato do roteador a partir de uma lista de enlaces bidirecionais.
+
+    Args:
+        n (int): Quantidade de roteadores
+        enlaces (set): Pares (i, j) de roteadores conectados
+        custo_unitario (bool): Usa custo 1 em todos os enlaces (muitos caminhos ECMP)
+        semente (int): Semente dos custos aleatórios
+
+    Returns:
+        dict: LSDB {ip: {"id", "vizinhos": {nome: (ip, custo)}, "prefixos", "seq"}}
+    """
+    aleatorio = random.Random(semente)
+    ips = [ip_roteador(i) for i in range(n)]
+    lsdb = {ip: {"id": ip, "vizinhos": {}, "prefixos": [f"{ip.rsplit('.', 1)[0]}.0/24"], "seq": 1} for ip in ips}
+    for i, j in sorted(enlaces):
+        # Custos na mesma escala da métrica de RTT usada pelos roteadores (segundos)
+        custo = 1 if custo_unitario else round(aleatorio.uniform(0.001, 0.01), 6)
+        lsdb[ips[i]]["vizinhos"][f"router{j + 1}"] = (ips[j], custo)
+        lsdb[ips[j]]["vizinhos"][f"router{i + 1}"] = (ips[i], custo)
+    return lsdb
+
+def topologia_anel(n, aleatorio):
+    """Enlaces de um anel com n roteadores."""
+    return {(i, (i + 1) % n) for i in range(n)} if n > 2 else topologia_linha(n, aleatorio)
+
+def topologia_linha(n, aleatorio):
+    """Enlaces de uma fila (linha) com n roteadores."""
+    return {(i, i + 1) for i in range(n - 1)}
+
+def topologia_grade(n, aleatorio):
+    """Enlaces de uma grade aproximadamente quadrada com n roteadores."""
+    colunas = max(1, math.isqrt(n))
+    enlaces = set()
+    for i in range(n):
+        if (i + 1) % colunas and i + 1 < n:
+            enlaces.add((i, i + 1))
+        if i + colunas < n:
+            enlaces.add((i, i + colunas))
+    return enlaces
+
+def topologia_erdos_renyi(n, aleatorio):
+    """
+    Enlaces de um grafo aleatório de Erdős–Rényi no modelo G(n, M).
+
+    São sorteados M = n * GRAU_MEDIO_ALEATORIO / 2 enlaces distintos, o que
+    mantém a geração linear mesmo com 10.000 roteadores. O grafo pode ser
+    desconexo, como nas redes reais com partições.
+    """
+    total = min(n * (n - 1) // 2, n * GRAU_MEDIO_ALEATORIO // 2)
+    enlaces = set()
+    while len(enlaces) < total:
+        i, j = aleatorio.randrange(n), aleatorio.randrange(n)
+        if i != j:
+            enlaces.add((min(i, j), max(i, j)))
+    return enlaces
+
+def topologia_barabasi_albert(n, aleatorio):
+    """Enlaces de um grafo livre de escala (Barabási–Albert, ligação preferencial)."""
+    m = min(ENLACES_BARABASI, n - 1)
+    enlaces = {(i, j) for i in range(m + 1) for j in range(i + 1, m + 1)}
+    # Cada roteador aparece uma vez por enlace: sortear desta lista é proporcional ao grau
+    extremidades = [x for enlace in enlaces for x in enlace]
+    for novo in range(m + 1, n):
+        escolhidos = set()
+        while len(escolhidos) < m:
+            escolhidos.add(aleatorio.choice(extremidades))
+        for j in escolhidos:
+            enlaces.add((j, novo))
+            extremidades += [j, novo]
+    return enlaces
+
+def topologia_fat_tree(n, aleatorio):
+    """
+    Enlaces de uma fat-tree k-ária (núcleo, agregação e borda, sem os hosts).
+
+    Usa o menor k par com 5k²/4 roteadores >= n; a quantidade real de
+    roteadores é a da fat-tree gerada.
+    """
+    k = 2
+    while 5 * k * k // 4 < n:
+        k += 2
+    metade = k // 2
+    nucleo = metade * metade
+    enlaces = set()
+    for pod in range(k):
+        agregacao = [nucleo + pod * k + a for a in range(metade)]
+        borda = [nucleo + pod * k + metade + b for b in range(metade)]
+        for a, switch in enumerate(agregacao):
+            for c in range(metade):
+                enlaces.add((a * metade + c, switch))
+            for b in borda:
+                enlaces.add((switch, b))
+    return enlaces
+
+TOPOLOGIAS = {
+    "anel": topologia_anel,
+    "linha": topologia_linha,
+    "grade": topologia_grade,
+    "erdos_renyi": topologia_erdos_renyi,
+    "barabasi_albert": topologia_barabasi_albert,
+    "fat_tree": topologia_fat_tree,
+}
+
+def gerar_lsdb(topologia, n, custo_unitario=False, semente=0):
+    """
+    Gera a LSDB de uma topologia.
+
+    Args:
+        topologia (str): Nome da topologia (chave de TOPOLOGIAS)
+        n (int): Quantidade desejada de roteadores
+        custo_unitario (bool): Usa custo 1 em todos os enlaces
+        semente (int): Semente da topologia e dos custos
+
+    Returns:
+        tuple: (LSDB, quantidade de enlaces)
+    """
+    enlaces = TOPOLOGIAS[topologia](n, random.Random(semente))
+    quantidade = max((max(enlace) for enlace in enlaces), default=n - 1) + 1
+    return montar_lsdb(max(n, quantidade), enlaces, custo_unitario, semente), len(enlaces)
+
+def escolher_enlace_arvore(incremental, lsdb):
+    """
+    Escolhe um enlace da árvore de caminhos mais curtos cuja retirada muda rotas.
+
+    São testados os enlaces vindos do predecessor de até TENTATIVAS_ENLACE
+    roteadores em torno da profundidade mediana: cada enlace é retirado da LSA
+    do predecessor e restaurado em seguida, e fica o que muda mais rotas nas
+    duas operações, de modo que a atualização medida sempre repara a árvore.
+    Se nenhum deles mudar rotas (desvios com o mesmo próximo salto, comuns em
+    grades e com ECMP), vale o primeiro enlace da origem que mude, já que a
+    retirada de um deles sempre altera os próximos saltos.
+
+    Args:
+        incremental (SPFIncremental): SPF já carregado com a LSDB
+        lsdb (dict): LSDB gerada
+
+    Returns:
+        tuple: (roteador cuja LSA muda, LSA original, LSA sem o enlace)
+
+    Raises:
+        AssertionError: Se nenhum enlace testado mudar rotas
+    """
+    def testar(v):
+        melhor = None
+        for p in sorted(incremental.pais[v]):
+            pai, filho = incremental.ips[p], incremental.ips[v]
+            original = lsdb[pai]
+            alterado = dict(original, seq=original["seq"] + 1, vizinhos={
+                nome: enlace for nome, enlace in original["vizinhos"].items() if enlace[0] != filho})
+            retirada = incremental.atualizar(pai, alterado)
+            restauracao = incremental.atualizar(pai, original)
+            if retirada and restauracao and (melhor is None or len(retirada) > melhor[0]):
+                melhor = (len(retirada), (pai, original, alterado))
+        return melhor
+
+    raiz = incremental.indice[incremental.origem]
+    alcancaveis = sorted((incremental.dist[v], v) for v in range(len(incremental.ips))
+                         if v != raiz and incremental.dist[v] < float('inf'))
+    meio = len(alcancaveis) // 2
+    ordem = sorted(range(len(alcancaveis)), key=lambda i: (abs(i - meio), i))
+    testados = [testar(alcancaveis[i][1]) for i in ordem[:TENTATIVAS_ENLACE]]
+    testados = [resultado for resultado in testados if resultado is not None]
+    if testados:
+        return max(testados, key=lambda resultado: resultado[0])[1]
+    for _, v in alcancaveis:
+        if raiz in incremental.pais[v]:
+            resultado = testar(v)
+            if resultado is not None:
+                return resultado[1]
+    raise AssertionError("nenhum enlace da árvore de caminhos mais curtos muda rotas ao ser retirado")
+
+def preparar_motores(lsdb):
+    """
+    Prepara as funções cronometradas de cada motor para uma LSDB.
+
+    Cada função executa uma operação completa do motor; o estado necessário
+    (tabela para o LFA, SPF incremental já carregado) é criado aqui, fora da
+    medição.
+
+    Args:
+        lsdb (dict): LSDB gerada
+
+    Returns:
+        dict: Nome do motor -> função sem argumentos
+    """
+    # A origem precisa de vizinhos (nas topologias aleatórias o primeiro roteador pode estar isolado)
+    origem = next((ip for ip, lsa in lsdb.items() if lsa["vizinhos"]), next(iter(lsdb)))
+    tabela = dijkstra(origem, lsdb)
+
+    def incremental_carga():
+        SPFIncremental(origem).carregar(lsdb)
+
+    # A atualização alterna entre retirar e restaurar um enlace da árvore de caminhos mais curtos
+    incremental = SPFIncremental(origem)
+    incremental.carregar(lsdb)
+    alvo, original, alterado = escolher_enlace_arvore(incremental, lsdb)
+    versoes = [alterado, original]
+
+    def incremental_atualizacao():
+        versoes.reverse()
+        incremental.atualizar(alvo, versoes[0])
+
+    return {
+        "dijkstra": lambda: dijkstra(origem, lsdb),
+        "spf_incremental_carga": incremental_carga,
+        "spf_incremental_atualizacao": incremental_atualizacao,
+        "lfa": lambda: alternativas_sem_laco(origem, lsdb, tabela),
+    }
+
+def medir(funcao, tempo_minimo, repeticoes_minimas):
+    """
+    Cronometra uma função repetindo-a até atingir o tempo e as repetições mínimos.
+
+    Args:
+        funcao (callable): Operação medida
+        tempo_minimo (float): Tempo total mínimo de medição (s)
+        repeticoes_minimas (int): Quantidade mínima de repetições
+
+    Returns:
+        tuple: (repetições, mediana (s), mínimo (s), pico de memória (KiB))
+    """
+    duracoes = []
+    inicio = time.perf_counter()
+    while len(duracoes) < repeticoes_minimas or time.perf_counter() - inicio < tempo_minimo:
+        t0 = time.perf_counter()
+        funcao()
+        duracoes.append(time.perf_counter() - t0)
+
+    # A memória é medida em uma execução separada: o tracemalloc deixa o código mais lento
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(duracoes), statistics.median(duracoes), min(duracoes), pico / 1024
+
+def versao_codigo():
+    """Retorna o commit atual do repositório (ou "-" fora de um repositório git)."""
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+        return saida.stdout.strip() or "-"
+    except (OSError, subprocess.SubprocessError):
+        return "-"
+
+def ler_referencia(caminho):
+    """
+    Lê a última medição de cada (topologia, roteadores, motor) de um CSV de resultados.
+
+    Args:
+        caminho (str): CSV gerado por este script
+
+    Returns:
+        dict: (topologia, roteadores, motor) -> mediana (s)
+    """
+    referencia = {}
+    with open(caminho) as file:
+        colunas = file.readline().strip().split(",")
+        for linha in file:
+            valores = dict(zip(colunas, linha.strip().split(",")))
+            if "mediana_s" in valores:
+                referencia[(valores["topologia"], int(valores["roteadores"]), valores["motor"])] = float(valores["mediana_s"])
+    return referencia
+
+def incluir_resultados(caminho, linhas):
+    """Acrescenta as linhas ao CSV de resultados, criando-o com o cabeçalho se necessário."""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    novo = not os.path.exists(caminho)
+    with open(caminho, "a") as file:
+        if novo:
+            file.write(CABECALHO + "\n")
+        for linha in linhas:
+            file.write(",".join(str(valor) for valor in linha) + "\n")
+
+def lista(texto, tipo=str):
+    """Converte uma lista separada por vírgulas."""
+    return [tipo(item) for item in texto.split(",") if item]
+
+def main():
+    """
+    Função principal que gera as topologias, mede cada motor, grava os
+    resultados e, se pedido, compara com uma execução de referência.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de SPF sobre LSDBs sintéticas.")
+    parser.add_argument("--topologias", type=lista, default=list(TOPOLOGIAS),
+                        help=f"topologias separadas por vírgula ({','.join(TOPOLOGIAS)})")
+    parser.add_argument("--tamanhos", type=lambda texto: lista(texto, int), default=TAMANHOS_PADRAO,
+                        help="quantidades de roteadores separadas por vírgula")
+    parser.add_argument("--motores", type=lista, default=None, help="motores medidos (padrão: todos)")
+    parser.add_argument("--custo-unitario", action="store_true", help="custo 1 em todos os enlaces (muitos ECMP)")
+    parser.add_argument("--semente", type=int, default=0, help="semente das topologias aleatórias e dos custos")
+    parser.add_argument("--tempo", type=float, default=0.5, help="tempo mínimo de medição de cada motor (s)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições mínimas de cada motor")
+    parser.add_argument("--saida", default=ARQUIVO_PADRAO, help="CSV em que os resultados são acrescentados")
+    parser.add_argument("--comparar", default=None, help="CSV de referência para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="aumento relativo da mediana aceito na comparação (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    desconhecidas = [t for t in args.topologias if t not in TOPOLOGIAS]
+    if desconhecidas:
+        print(f"{Colors.RED}Erro: topologias desconhecidas: {', '.join(desconhecidas)}{Colors.NC}")
+        sys.exit(2)
+    referencia = ler_referencia(args.comparar) if args.comparar else {}
+
+    data = time.strftime("%Y-%m-%dT%H:%M:%S")
+    versao = versao_codigo()
+    python = platform.python_version()
+    linhas = []
+    regressoes = []
+
+    print(f"{Colors.YELLOW}{'Topologia':<16} {'Roteadores':>10} {'Enlaces':>8} {'Motor':<28} "
+          f"{'Mediana (ms)':>12} {'ops/s':>10} {'Memória (KiB)':>14}{Colors.NC}")
+    for topologia in args.topologias:
+        for tamanho in args.tamanhos:
+            lsdb, enlaces = gerar_lsdb(topologia, tamanho, args.custo_unitario, args.semente)
+            roteadores = len(lsdb)
+            for motor, funcao in preparar_motores(lsdb).items():
+                if args.motores and motor not in args.motores:
+                    continue
+                repeticoes, mediana, minimo, memoria = medir(funcao, args.tempo, args.repeticoes)
+                linhas.append((data, versao, python, topologia, roteadores, enlaces, motor, repeticoes,
+                               f"{mediana:.9f}", f"{minimo:.9f}", f"{1 / mediana:.2f}", f"{memoria:.1f}"))
+
+                comparacao = ""
+                anterior = referencia.get((topologia, roteadores, motor))
+                if anterior:
+                    variacao = mediana / anterior - 1
+                    cor = Colors.RED if variacao > args.tolerancia else Colors.GREEN
+                    comparacao = f" {cor}{variacao:+.1%}{Colors.NC}"
+                    if variacao > args.tolerancia:
+                        regressoes.append((topologia, roteadores, motor, variacao))
+                print(f"{topologia:<16} {roteadores:>10} {enlaces:>8} {motor:<28} "
+                      f"{mediana * 1000:>12.3f} {1 / mediana:>10.1f} {memoria:>14.1f}{comparacao}")
+
+    incluir_resultados(args.saida, linhas)
+    print(f"\n{Colors.BLUE}{len(linhas)} medições acrescentadas a {args.saida}.{Colors.NC}")
+
+    if regressoes:
+        print(f"{Colors.RED}Regressões acima de {args.tolerancia:.0%}:{Colors.NC}")
+        for topologia, roteadores, motor, variacao in regressoes:
+            print(f"  {topologia} com {roteadores} roteadores, {motor}: {variacao:+.1%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,9 @@ def get_routing_table(container, qtd_routers):
     """Obtém a tabela de roteamento de um container."""
     while True:
         cmd = f"docker exec {container} ip route"
-        qtd_connexao = len(os.popen(cmd).read().splitlines())
+        # Rotas ECMP ocupam uma linha por próximo salto ("nexthop via ...", indentadas);
+        # só as linhas de destino contam
+        qtd_connexao = sum(1 for linha in os.popen(cmd).read().splitlines() if linha and not linha[0].isspace())
         if qtd_connexao == qtd_routers + 1:
             break
 